@@ -0,0 +1,256 @@
+# Headless HTTP API for the assistant services
+"""
+Run with several worker processes sharing the on-disk vector store and caches:
+
+    python api_server.py --workers 4 --port 8000
+
+Each worker builds its own lazy service instances. Blocking service calls run
+on a bounded thread pool; once API_MAX_INFLIGHT requests are in flight, new
+requests wait up to API_QUEUE_TIMEOUT seconds for a slot and then get a 503
+with a Retry-After header.
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Optional
+
+from fastapi import FastAPI, File, HTTPException, UploadFile
+from fastapi.responses import FileResponse
+from pydantic import BaseModel
+
+from config.settings import Settings
+from services.pipeline import create_services, run_pipeline
+from utils.conversation_memory import ConversationMemory
+from utils.logging_setup import configure_logging
+from utils.vector_db import list_collections, validate_collection_name
+
+
+class ChatMessage(BaseModel):
+    role: str
+    content: str
+
+
+class ChatRequest(BaseModel):
+    message: str
+    target_language: str = "English"
+    translate: bool = True
+    rag: bool = True
+    image: bool = True
+    tts: bool = False
+    # Earlier turns, oldest first; the server keeps no conversation state
+    history: List[ChatMessage] = []
+    # Knowledge-base collections to search; empty means the default collection
+    collections: List[str] = []
+
+
+class TranslateRequest(BaseModel):
+    text: str
+    target_language: str
+
+
+class SpeechRequest(BaseModel):
+    text: str
+    language: str = "English"
+
+
+class ImageRequest(BaseModel):
+    prompt: str
+    size: str = "1024x1024"
+    quality: str = "standard"
+
+
+class UploadedFile:
+    """Adapter giving an uploaded file the name/read() interface services expect"""
+
+    def __init__(self, name: str, data: bytes):
+        self.name = name
+        self._data = data
+
+    def read(self) -> bytes:
+        return self._data
+
+
+class Backpressure:
+    """Bounded admission for in-flight requests"""
+
+    def __init__(self, max_inflight: int, queue_timeout: float):
+        self.queue_timeout = queue_timeout
+        self._slots = asyncio.Semaphore(max_inflight)
+
+    async def __aenter__(self):
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            raise HTTPException(
+                status_code=503,
+                detail="Server busy, retry later",
+                headers={"Retry-After": str(max(1, int(self.queue_timeout)))}
+            )
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self._slots.release()
+
+
+def check_collections(names: list) -> list:
+    """Validate collection names from a request, as a 422 rather than a server error"""
+    try:
+        return [validate_collection_name(name) for name in names]
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+
+def create_app(services: dict = None) -> FastAPI:
+    """
+    Build the API application
+
+    Args:
+        services: Service mapping (defaults to create_services())
+    """
+    services = services if services is not None else create_services()
+    executor = ThreadPoolExecutor(max_workers=Settings.API_THREADS, thread_name_prefix="api")
+
+    @asynccontextmanager
+    async def lifespan(app):
+        # Runs in every worker process, each writing its own log file
+        configure_logging(process_name=f"api-{os.getpid()}")
+        yield
+        executor.shutdown(wait=False)
+
+    app = FastAPI(title="Multi-Modal AI Assistant API", lifespan=lifespan)
+    app.state.services = services
+    app.state.backpressure = None
+
+    async def run_blocking(func, *args, **kwargs):
+        # Semaphore is created lazily so it binds to the worker's event loop
+        if app.state.backpressure is None:
+            app.state.backpressure = Backpressure(Settings.API_MAX_INFLIGHT, Settings.API_QUEUE_TIMEOUT)
+        async with app.state.backpressure:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(executor, lambda: func(*args, **kwargs))
+
+    @app.get("/health")
+    async def health():
+        return {
+            "status": "ok",
+            "pid": os.getpid(),
+            "loaded_services": [name for name, service in services.items() if getattr(service, 'is_loaded', True)]
+        }
+
+    @app.post("/chat")
+    async def chat(request: ChatRequest):
+        if request.target_language not in Settings.SUPPORTED_LANGUAGES:
+            raise HTTPException(status_code=422, detail=f"Unsupported language: {request.target_language}")
+        collections = check_collections(request.collections) or None
+        history = previous_query = None
+        if request.history:
+            memory = ConversationMemory.from_messages(
+                {'role': message.role, 'content': message.content} for message in request.history
+            )
+            history, previous_query = memory.context_text(), memory.last_user_message()
+        response_data = await run_blocking(
+            run_pipeline, services, request.message, request.target_language,
+            request.translate, request.rag, request.image, request.tts,
+            history=history, collections=collections, previous_query=previous_query
+        )
+        if 'audio' in response_data:
+            response_data['audio'] = f"/audio/{Path(response_data['audio']).name}"
+        return response_data
+
+    @app.post("/documents")
+    async def add_document(file: UploadFile = File(...), collection: Optional[str] = None):
+        if collection:
+            check_collections([collection])
+        data = await file.read()
+        success = await run_blocking(services['rag'].add_document, UploadedFile(file.filename, data),
+                                     collection=collection)
+        if not success:
+            raise HTTPException(status_code=500, detail=f"Failed to process {file.filename}")
+        return {"document": file.filename, "collection": collection or Settings.DEFAULT_COLLECTION,
+                "status": "added"}
+
+    @app.get("/documents/stats")
+    async def document_stats(collection: Optional[str] = None):
+        if collection:
+            check_collections([collection])
+        return await run_blocking(services['rag'].get_stats, collection=collection)
+
+    @app.get("/collections")
+    async def collections():
+        # Read from disk so listing does not load the RAG service
+        return {"collections": await run_blocking(list_collections)}
+
+    @app.post("/transcribe")
+    async def transcribe(file: UploadFile = File(...)):
+        whisper = services['whisper']
+        if not hasattr(whisper, 'transcribe'):
+            raise HTTPException(status_code=501, detail="Transcription is not available")
+        data = await file.read()
+        suffix = Path(file.filename or "audio.wav").suffix or ".wav"
+        with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp_file:
+            tmp_file.write(data)
+        try:
+            text = await run_blocking(whisper.transcribe, tmp_file.name)
+        finally:
+            os.unlink(tmp_file.name)
+        if text is None:
+            raise HTTPException(status_code=502, detail="Transcription failed")
+        return {"text": text}
+
+    @app.post("/translate")
+    async def translate(request: TranslateRequest):
+        text = await run_blocking(services['translator'].translate, request.text, request.target_language)
+        return {"text": text, "target_language": request.target_language}
+
+    @app.post("/tts")
+    async def tts(request: SpeechRequest):
+        audio_file = await run_blocking(services['tts'].generate_speech, request.text, request.language)
+        if not audio_file:
+            raise HTTPException(status_code=502, detail="Speech generation failed")
+        return FileResponse(audio_file, media_type="audio/mpeg")
+
+    @app.get("/audio/{name}")
+    async def audio(name: str):
+        audio_file = Settings.TEMP_AUDIO_DIR / Path(name).name
+        if not audio_file.exists():
+            raise HTTPException(status_code=404, detail="Audio not found")
+        return FileResponse(audio_file, media_type="audio/mpeg")
+
+    @app.post("/images")
+    async def images(request: ImageRequest):
+        image_url = await run_blocking(services['dalle'].generate_image, request.prompt, request.size, request.quality)
+        if not image_url:
+            raise HTTPException(status_code=502, detail="Image generation failed")
+        return {"url": image_url}
+
+    @app.get("/images")
+    async def image_history(limit: Optional[int] = 50):
+        images = await run_blocking(services['dalle'].get_generated_images)
+        return images[-limit:] if limit else images
+
+    return app
+
+
+app = create_app()
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Run the headless assistant API")
+    parser.add_argument('--host', default=Settings.API_HOST)
+    parser.add_argument('--port', type=int, default=Settings.API_PORT)
+    parser.add_argument('--workers', type=int, default=Settings.API_WORKERS)
+    args = parser.parse_args()
+
+    Settings.ensure_directories()
+    # An import string lets uvicorn start each worker process with its own app
+    uvicorn.run("api_server:app", host=args.host, port=args.port, workers=args.workers)
+
+
+if __name__ == "__main__":
+    main()
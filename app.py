@@ -7,29 +7,23 @@ import tempfile
 import asyncio
 from datetime import datetime
 
-# Import custom services
-from services.whisper_service import WhisperService
-from services.translation_service import TranslationService
-from services.rag_service import RAGService
-from services.dalle_service import DalleService
-from services.tts_service import TTSService
-from utils.session_manager import SessionManager
+# Service modules are imported on first use, not at startup
+from utils.lazy_loader import warm_up
+from utils.logging_setup import configure_logging
+from services.pipeline import create_services, run_pipeline
+from utils.conversation_memory import ConversationMemory
+from utils.vector_db import list_collections, validate_collection_name
 from config.settings import Settings
 
 # Initialize services
 @st.cache_resource
 def initialize_services():
-    """Initialize all AI services"""
-    return {
-        'whisper': WhisperService(),
-        'translator': TranslationService(),
-        'rag': RAGService(),
-        'dalle': DalleService(),
-        'tts': TTSService(),
-        'session': SessionManager()
-    }
+    """Create lazy proxies for all AI services"""
+    return create_services()
 
 def main():
+    # Streamlit reruns this script on every interaction; only the first call sets logging up
+    configure_logging()
     st.set_page_config(
         page_title="Multi-Modal AI Assistant",
         page_icon="🧠",
@@ -38,7 +32,7 @@ def main():
     )
     
     # Custom CSS
-    with open("static/styles.css") as f:
+    with open("static/styles.css", encoding='utf-8') as f:
         st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
     
     # Initialize services
@@ -69,6 +63,14 @@ def main():
         enable_image_gen = st.checkbox("🎨 Image Generation", value=True)
         enable_tts = st.checkbox("🔊 Text-to-Speech", value=True)
         
+        # Knowledge bases searched by RAG (listed from disk, without loading any index)
+        available_collections = list_collections() or [Settings.DEFAULT_COLLECTION]
+        collections = st.multiselect(
+            "📚 Knowledge Bases",
+            available_collections,
+            default=[available_collections[0]]
+        )
+        
         # Session management
         st.markdown("---")
         if st.button("🗑️ Clear Session"):
@@ -84,35 +86,37 @@ def main():
     
     with tab1:
         handle_chat_interface(services, input_method, target_language, 
-                            enable_translation, enable_rag, enable_image_gen, enable_tts)
+                            enable_translation, enable_rag, enable_image_gen, enable_tts, collections)
     
     with tab2:
-        handle_knowledge_base(services['rag'])
+        handle_knowledge_base(services['rag'], available_collections)
     
     with tab3:
         handle_image_gallery(services['dalle'])
     
     with tab4:
         handle_analytics(services['session'])
+    
+    # Build the remaining services in the background once the page is up
+    if Settings.WARM_UP_SERVICES:
+        warm_up(services, Settings.WARM_UP_SERVICES)
 
 def handle_chat_interface(services, input_method, target_language, 
-                         enable_translation, enable_rag, enable_image_gen, enable_tts):
+                         enable_translation, enable_rag, enable_image_gen, enable_tts, collections=None):
     """Main chat interface handler"""
     
-    # Initialize chat history
-    if 'messages' not in st.session_state:
-        st.session_state.messages = []
-    
-    # Display chat history
-    for message in st.session_state.messages:
-        with st.chat_message(message["role"]):
-            st.markdown(message["content"])
-            
-            # Display additional content (images, audio)
-            if "image" in message:
-                st.image(message["image"], caption="Generated Image")
-            if "audio" in message:
-                st.audio(message["audio"])
+    # Initialize chat history (bounded, with older turns summarized)
+    if 'memory' not in st.session_state:
+        st.session_state.memory = ConversationMemory()
+        st.session_state.render_window = Settings.CHAT_RENDER_WINDOW
+    memory = st.session_state.memory
+    
+    # Display only the most recent messages; older ones are loaded on request
+    if memory.has_older(st.session_state.render_window):
+        if st.button("⬆️ Load earlier messages"):
+            st.session_state.render_window += Settings.CHAT_RENDER_WINDOW
+    for message in memory.window(st.session_state.render_window):
+        render_message(message)
     
     # Input handling based on method
     user_input = None
@@ -139,14 +143,30 @@ def handle_chat_interface(services, input_method, target_language,
     # Process user input
     if user_input:
         process_user_input(services, user_input, target_language, 
-                          enable_translation, enable_rag, enable_image_gen, enable_tts)
+                          enable_translation, enable_rag, enable_image_gen, enable_tts, collections)
+
+def render_message(message):
+    """Render one chat history message"""
+    with st.chat_message(message["role"]):
+        st.markdown(message["content"])
+        
+        # Display additional content (images, audio)
+        if "image" in message:
+            st.image(message["image"], caption="Generated Image")
+        if "audio" in message:
+            st.audio(message["audio"])
 
 def process_user_input(services, user_input, target_language, 
-                      enable_translation, enable_rag, enable_image_gen, enable_tts):
+                      enable_translation, enable_rag, enable_image_gen, enable_tts, collections=None):
     """Process user input through various AI services"""
+    memory = st.session_state.memory
+    
+    # Context for follow-up questions, taken before this message is added
+    history = memory.context_text()
+    previous_query = memory.last_user_message()
     
     # Add user message to chat
-    st.session_state.messages.append({"role": "user", "content": user_input})
+    memory.add("user", user_input)
     
     with st.chat_message("user"):
         st.markdown(user_input)
@@ -154,48 +174,47 @@ def process_user_input(services, user_input, target_language,
     # Process with AI assistant
     with st.chat_message("assistant"):
         response_placeholder = st.empty()
-        response_data = {}
         
-        # Step 1: Translation (if enabled)
-        if enable_translation and target_language != "English":
-            translated_input = services['translator'].translate(user_input, target_language)
-            response_data['translation'] = translated_input
-            response_placeholder.markdown(f"**Translation:** {translated_input}")
+        def render_step(key, value):
+            if key == 'translation':
+                response_placeholder.markdown(f"**Translation:** {value}")
+            elif key == 'rag_response':
+                response_placeholder.markdown(f"**RAG Response:** {value}")
+            elif key == 'image':
+                st.image(value, caption="Generated Image")
+            elif key == 'audio':
+                st.audio(value)
         
-        # Step 2: RAG-enhanced response (if enabled)
-        if enable_rag:
-            rag_response = services['rag'].get_response(user_input)
-            response_data['rag_response'] = rag_response
-            response_placeholder.markdown(f"**RAG Response:** {rag_response}")
+        with st.spinner("Thinking..."):
+            response_data = run_pipeline(
+                services, user_input, target_language,
+                enable_translation, enable_rag, enable_image_gen, enable_tts,
+                on_step=render_step, history=history, collections=collections or None,
+                previous_query=previous_query
+            )
         
-        # Step 3: Image generation (if requested and enabled)
-        if enable_image_gen and any(keyword in user_input.lower() for keyword in 
-                                   ['generate image', 'create picture', 'draw', 'صورة', 'رسم']):
-            with st.spinner("Generating image..."):
-                image_url = services['dalle'].generate_image(user_input)
-                if image_url:
-                    response_data['image'] = image_url
-                    st.image(image_url, caption="Generated Image")
-        
-        # Step 4: Text-to-speech (if enabled)
-        if enable_tts:
-            final_response = response_data.get('rag_response', user_input)
-            audio_file = services['tts'].generate_speech(final_response, target_language)
-            if audio_file:
-                response_data['audio'] = audio_file
-                st.audio(audio_file)
-        
-        # Save complete response
-        st.session_state.messages.append({
-            "role": "assistant", 
-            "content": response_data.get('rag_response', 'Response generated'),
+        # Save complete response; without a RAG answer the placeholder is shown but not sent to the model
+        memory.add(
+            "assistant",
+            response_data.get('rag_response', 'Response generated'),
+            in_context='rag_response' in response_data,
             **{k: v for k, v in response_data.items() if k != 'rag_response'}
-        })
+        )
 
-def handle_knowledge_base(rag_service):
+def handle_knowledge_base(rag_service, available_collections):
     """Knowledge base management interface"""
     st.subheader("📚 Knowledge Base Management")
     
+    # Target collection for uploads; typing a new name creates it on first upload
+    collection = st.selectbox("Collection", available_collections)
+    new_collection = st.text_input("Or create a new collection", placeholder="team-docs")
+    if new_collection:
+        try:
+            collection = validate_collection_name(new_collection)
+        except ValueError as e:
+            st.error(str(e))
+            return
+    
     # Upload documents
     uploaded_files = st.file_uploader(
         "Upload Documents", 
@@ -207,14 +226,17 @@ def handle_knowledge_base(rag_service):
         for file in uploaded_files:
             if st.button(f"Process {file.name}"):
                 with st.spinner(f"Processing {file.name}..."):
-                    success = rag_service.add_document(file)
+                    success = rag_service.add_document(file, collection=collection)
                     if success:
                         st.success(f"✅ {file.name} added to knowledge base")
                     else:
                         st.error(f"❌ Failed to process {file.name}")
     
-    # Display current knowledge base stats
-    stats = rag_service.get_stats()
+    # Display current knowledge base stats without forcing the index to load
+    if not rag_service.is_loaded:
+        st.caption("Knowledge base loads on first use.")
+        return
+    stats = rag_service.get_stats(collection=collection)
     col1, col2, col3 = st.columns(3)
     
     with col1:
@@ -228,6 +250,11 @@ def handle_image_gallery(dalle_service):
     """Image gallery interface"""
     st.subheader("🎨 Generated Images Gallery")
     
+    # Every tab runs on each render; build the image service only once the gallery is asked for
+    if not dalle_service.is_loaded and not st.button("Show gallery"):
+        st.caption("The gallery loads on request.")
+        return
+    
     # Display generated images
     images = dalle_service.get_generated_images()
     
@@ -244,6 +271,11 @@ def handle_analytics(session_manager):
     """Analytics dashboard"""
     st.subheader("📊 Usage Analytics")
     
+    # As with the gallery, keep the session manager out of the first render
+    if not session_manager.is_loaded and not st.button("Show analytics"):
+        st.caption("Analytics load on request.")
+        return
+    
     analytics = session_manager.get_analytics()
     
     col1, col2 = st.columns(2)
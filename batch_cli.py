@@ -0,0 +1,269 @@
+# Offline batch processing: bulk ingestion and bulk Q&A
+"""
+Ingest a directory tree into the knowledge base:
+
+    python batch_cli.py ingest docs/ --workers 8 --collection team-docs
+
+Files are loaded, split and embedded in parallel and added to the index in
+batches. A file is recorded in the checkpoint only after the index holding
+it has been saved, so an interrupted run picks up where it stopped when
+re-run with the same checkpoint.
+
+Run a JSONL file of queries (one {"id": ..., "query": ..., "language": ...}
+object per line) through the assistant pipeline:
+
+    python batch_cli.py ask questions.jsonl --output answers.jsonl --concurrency 8 --translate --tts
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+from config.settings import Settings
+from utils.durable_store import WriteAheadLog
+from utils.logging_setup import configure_logging
+from utils.vector_db import validate_collection_name
+
+DEFAULT_EXTENSIONS = ['.pdf', '.txt', '.md']
+
+
+class IngestCheckpoint:
+    """Write-ahead log of files whose chunks are safely in the saved index"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.log = WriteAheadLog(path)
+        self.done = set()
+        # A crash can leave a torn final record; it is dropped and that file is simply redone
+        records, _ = self.log.replay(repair=True)
+        for entry in records:
+            self.done.add(self.key(entry['path'], entry['size'], entry['mtime']))
+
+    @staticmethod
+    def key(path, size, mtime) -> tuple:
+        return (str(path), int(size), float(mtime))
+
+    @staticmethod
+    def file_key(path: Path) -> tuple:
+        stat = path.stat()
+        return IngestCheckpoint.key(path.resolve(), stat.st_size, stat.st_mtime)
+
+    def is_done(self, path: Path) -> bool:
+        return self.file_key(path) in self.done
+
+    def mark_done(self, entries: list):
+        """Record files as ingested; entries are (path, chunk_count) pairs"""
+        keys = [(self.file_key(path), chunk_count) for path, chunk_count in entries]
+        self.log.commit([
+            {'path': key[0], 'size': key[1], 'mtime': key[2], 'chunks': chunk_count} for key, chunk_count in keys
+        ])
+        self.done.update(key for key, _ in keys)
+
+
+def find_files(root: Path, extensions: list) -> list:
+    """All files under ``root`` with one of ``extensions``, in a stable order"""
+    extensions = {ext.lower() for ext in extensions}
+    return sorted(path for path in root.rglob('*') if path.is_file() and path.suffix.lower() in extensions)
+
+
+def ingest(rag, root: Path, checkpoint: IngestCheckpoint, workers: int = 4,
+           extensions: list = None, save_every: int = None, log=print, collection: str = None) -> dict:
+    """
+    Ingest every matching file under ``root`` into ``rag``
+
+    Args:
+        rag: RAGService instance
+        root: Directory to walk
+        checkpoint: Files already recorded here are skipped
+        workers: Files loaded and embedded concurrently
+        save_every: Files added per index save and checkpoint flush
+        collection: Target collection (default Settings.DEFAULT_COLLECTION)
+
+    Returns:
+        Throughput report
+    """
+    save_every = save_every or Settings.INGEST_SAVE_EVERY
+    files = find_files(root, extensions or DEFAULT_EXTENSIONS)
+    pending = [path for path in files if not checkpoint.is_done(path)]
+    log(f"Found {len(files)} files, {len(files) - len(pending)} already ingested, {len(pending)} to go")
+
+    report = {'files_total': len(files), 'files_skipped': len(files) - len(pending),
+              'files_ingested': 0, 'files_failed': 0, 'chunks': 0}
+    start_time = time.perf_counter()
+
+    def prepare(path: Path):
+        chunks = rag.load_document(path, source=str(path.relative_to(root)))
+        return chunks, (rag.embed_chunks(chunks) if chunks else [])
+
+    batch = []
+
+    def flush():
+        # Only the main thread writes to the index; the lock spans the whole
+        # batch so no other process can save in between and lose our additions
+        with rag.lock(collection):
+            for path, chunks, vectors in batch:
+                rag.add_chunks(chunks, vectors, save=False, collection=collection)
+            if not rag.save(collection):
+                raise RuntimeError("Vector store save failed; stopping so the checkpoint stays accurate")
+        checkpoint.mark_done([(path, len(chunks)) for path, chunks, _ in batch])
+        report['files_ingested'] += len(batch)
+        report['chunks'] += sum(len(chunks) for _, chunks, _ in batch)
+        batch.clear()
+        elapsed = time.perf_counter() - start_time
+        log(f"  {report['files_ingested']}/{len(pending)} files, {report['chunks']} chunks "
+            f"({report['files_ingested'] / elapsed:.1f} files/s)")
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(prepare, path): path for path in pending}
+        try:
+            for future in as_completed(futures):
+                # Drop our reference so finished results don't pile up in memory
+                path = futures.pop(future)
+                try:
+                    chunks, vectors = future.result()
+                except Exception as e:
+                    report['files_failed'] += 1
+                    log(f"  Failed {path}: {e}")
+                    continue
+                batch.append((path, chunks, vectors))
+                if len(batch) >= save_every:
+                    flush()
+            if batch:
+                flush()
+        except BaseException:
+            # Don't keep embedding files that will not be saved (save failure, Ctrl-C)
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+
+    elapsed = time.perf_counter() - start_time
+    report['elapsed_s'] = elapsed
+    report['files_per_s'] = report['files_ingested'] / elapsed if elapsed else 0.0
+    report['chunks_per_s'] = report['chunks'] / elapsed if elapsed else 0.0
+    return report
+
+
+def read_queries(path: Path) -> list:
+    """Parse a JSONL query file; plain strings are accepted as queries"""
+    queries = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            entry = json.loads(line)
+            if isinstance(entry, str):
+                entry = {'query': entry}
+            entry.setdefault('id', line_number)
+            queries.append(entry)
+    return queries
+
+
+def ask(services: dict, queries: list, output, concurrency: int = 4, language: str = "English",
+        translate: bool = False, tts: bool = False, collections: list = None) -> dict:
+    """
+    Run queries through the assistant pipeline and write one JSON result per line
+
+    A query entry may name its own "collections" to search instead of ``collections``.
+
+    Returns:
+        Throughput and latency report
+    """
+    from services.pipeline import run_pipeline
+
+    latencies = []
+    failures = 0
+
+    def run_one(entry: dict):
+        query_start = time.perf_counter()
+        result = run_pipeline(
+            services, entry['query'], entry.get('language', language),
+            enable_translation=translate, enable_rag=True, enable_image_gen=False, enable_tts=tts,
+            collections=entry.get('collections', collections)
+        )
+        return entry, result, time.perf_counter() - query_start
+
+    start_time = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = [executor.submit(run_one, entry) for entry in queries]
+        for future in as_completed(futures):
+            try:
+                entry, result, latency = future.result()
+            except Exception as e:
+                failures += 1
+                print(f"Query failed: {e}", file=sys.stderr)
+                continue
+            latencies.append(latency)
+            output.write(json.dumps({**entry, **result, 'latency_s': round(latency, 4)}, ensure_ascii=False) + '\n')
+            output.flush()
+
+    elapsed = time.perf_counter() - start_time
+    report = {'queries': len(queries), 'failed': failures, 'elapsed_s': elapsed,
+              'queries_per_s': len(latencies) / elapsed if elapsed else 0.0}
+    if latencies:
+        latencies.sort()
+        report['latency_p50_s'] = statistics.median(latencies)
+        report['latency_p95_s'] = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+        report['latency_max_s'] = latencies[-1]
+    return report
+
+
+def main(argv: list = None):
+    parser = argparse.ArgumentParser(description="Bulk ingestion and bulk Q&A for the AI assistant")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    ingest_parser = subparsers.add_parser('ingest', help="Ingest a directory tree into the knowledge base")
+    ingest_parser.add_argument('directory', type=Path)
+    ingest_parser.add_argument('--workers', type=int, default=4, help="Files loaded/embedded in parallel")
+    ingest_parser.add_argument('--collection', help="Target collection (default: %s)" % Settings.DEFAULT_COLLECTION)
+    ingest_parser.add_argument('--checkpoint', type=Path,
+                               help="Resume file (default: %s, one per collection)" % Settings.INGEST_CHECKPOINT)
+    ingest_parser.add_argument('--extensions', nargs='+', default=DEFAULT_EXTENSIONS)
+    ingest_parser.add_argument('--save-every', type=int, default=Settings.INGEST_SAVE_EVERY,
+                               help="Files per index save/checkpoint")
+
+    ask_parser = subparsers.add_parser('ask', help="Run a JSONL file of queries")
+    ask_parser.add_argument('queries', type=Path)
+    ask_parser.add_argument('--output', type=Path, help="Results JSONL (default: stdout)")
+    ask_parser.add_argument('--concurrency', type=int, default=4)
+    ask_parser.add_argument('--language', default="English", choices=list(Settings.SUPPORTED_LANGUAGES))
+    ask_parser.add_argument('--translate', action='store_true')
+    ask_parser.add_argument('--tts', action='store_true')
+    ask_parser.add_argument('--collections', nargs='+', help="Collections to search (default: the default collection)")
+
+    args = parser.parse_args(argv)
+    Settings.ensure_directories()
+    # A batch job may run next to the app, so it logs to its own file
+    configure_logging(process_name=f"batch-{os.getpid()}")
+
+    from services.pipeline import create_services
+    services = create_services()
+
+    if args.command == 'ingest':
+        if not args.directory.is_dir():
+            parser.error(f"{args.directory} is not a directory")
+        checkpoint = args.checkpoint or Settings.INGEST_CHECKPOINT
+        if args.checkpoint is None and args.collection:
+            # The same files may go into several collections
+            checkpoint = checkpoint.with_name(f"{checkpoint.stem}.{validate_collection_name(args.collection)}.jsonl")
+        report = ingest(services['rag'].get(), args.directory, IngestCheckpoint(checkpoint),
+                        workers=args.workers, extensions=args.extensions, save_every=args.save_every,
+                        collection=args.collection)
+    else:
+        queries = read_queries(args.queries)
+        output = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+        try:
+            report = ask(services, queries, output, concurrency=args.concurrency, language=args.language,
+                         translate=args.translate, tts=args.tts, collections=args.collections)
+        finally:
+            if args.output:
+                output.close()
+
+    print(json.dumps(report, indent=2), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+# Deterministic offline stand-ins for every remote backend
+"""
+Each fake mimics the interface the real service wraps (langchain embeddings
+and LLMs, googletrans, gTTS, openai.Image), returns output that depends only
+on its input, counts backend calls, and sleeps for a configurable injected
+latency so benchmarks can model a slow provider without a network.
+"""
+import hashlib
+import re
+import threading
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+try:
+    from langchain.embeddings.base import Embeddings as _EmbeddingsBase
+except ImportError:  # embeddings fake still works for non-langchain benchmarks
+    _EmbeddingsBase = object
+
+_WORD = re.compile(r"\w+")
+
+
+class Latency:
+    """Injected delay of ``per_call`` seconds plus ``per_item`` seconds per batch item"""
+
+    def __init__(self, per_call: float = 0.0, per_item: float = 0.0):
+        self.per_call = per_call
+        self.per_item = per_item
+
+    def wait(self, items: int = 1):
+        delay = self.per_call + self.per_item * items
+        if delay > 0:
+            time.sleep(delay)
+
+
+class CallCounter:
+    """Thread-safe backend call/item counter shared by the fakes"""
+
+    def __init__(self):
+        self.calls = 0
+        self.items = 0
+        self._lock = threading.Lock()
+
+    def record(self, items: int = 1):
+        with self._lock:
+            self.calls += 1
+            self.items += items
+
+
+def _stable_hash(text: str) -> int:
+    return int.from_bytes(hashlib.sha1(text.encode('utf-8')).digest()[:8], 'little')
+
+
+class FakeEmbeddings(_EmbeddingsBase):
+    """
+    Hashed bag-of-words embeddings.
+
+    Texts sharing words get similar vectors, so retrieval over a fake corpus
+    still behaves like retrieval rather than random lookups.
+    """
+
+    def __init__(self, dims: int = 256, latency: Latency = None):
+        self.dims = dims
+        self.latency = latency or Latency()
+        self.counter = CallCounter()
+
+    def _embed(self, text: str) -> list:
+        vector = np.zeros(self.dims, dtype=np.float32)
+        for word in _WORD.findall(text.lower()):
+            value = _stable_hash(word)
+            vector[value % self.dims] += 1.0 if (value >> 32) & 1 else -1.0
+        norm = np.linalg.norm(vector)
+        if norm:
+            vector /= norm
+        return vector.tolist()
+
+    def embed_documents(self, texts: list) -> list:
+        self.counter.record(len(texts))
+        self.latency.wait(len(texts))
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> list:
+        self.counter.record(1)
+        self.latency.wait(1)
+        return self._embed(text)
+
+
+def make_fake_llm(latency: Latency = None):
+    """
+    Build a langchain LLM that answers with a digest of its prompt
+
+    Imported lazily because langchain's LLM base class is a pydantic model
+    and needs langchain installed.
+    """
+    from langchain.llms.base import LLM
+
+    from utils.file_processor import count_tokens
+
+    class FakeLLM(LLM):
+        delay: float = 0.0
+        counter: object = None
+        tokens: object = None
+
+        @property
+        def _llm_type(self) -> str:
+            return "fake"
+
+        def _call(self, prompt: str, stop=None, run_manager=None, **kwargs) -> str:
+            # items counts prompt characters (tokens for self.tokens), so benchmarks can report prompt size
+            self.counter.record(len(prompt))
+            self.tokens.record(count_tokens(prompt))
+            if self.delay:
+                time.sleep(self.delay)
+            return f"Answer {hashlib.sha1(prompt.encode('utf-8')).hexdigest()[:12]} ({len(prompt)} prompt chars)"
+
+    latency = latency or Latency()
+    return FakeLLM(delay=latency.per_call, counter=CallCounter(), tokens=CallCounter())
+
+
+class FakeTranslator:
+    """googletrans.Translator stand-in"""
+
+    def __init__(self, latency: Latency = None):
+        self.latency = latency or Latency()
+        self.counter = CallCounter()
+
+    def translate(self, text: str, dest: str = 'en', src: str = 'auto'):
+        self.counter.record(1)
+        self.latency.wait(1)
+        return SimpleNamespace(text=f"[{dest}] {text}", src=src, dest=dest)
+
+    def detect(self, text: str):
+        self.counter.record(1)
+        self.latency.wait(1)
+        return SimpleNamespace(lang='en', confidence=1.0)
+
+
+class FakeTTS:
+    """
+    gTTS stand-in; an instance is passed as TTSService(engine=...)
+
+    Calling it with gTTS's constructor arguments returns an object whose
+    save() writes deterministic bytes.
+    """
+
+    def __init__(self, latency: Latency = None):
+        self.latency = latency or Latency()
+        self.counter = CallCounter()
+
+    def __call__(self, text: str, lang: str = 'en', slow: bool = False, timeout=None):
+        engine = self
+
+        class Speech:
+            def save(self, path):
+                engine.counter.record(1)
+                engine.latency.wait(1)
+                with open(path, 'wb') as f:
+                    f.write(b"ID3" + hashlib.sha1(f"{lang}:{text}".encode('utf-8')).digest())
+
+        return Speech()
+
+
+class FakeImageAPI:
+    """openai.Image stand-in; passed as DalleService(image_api=...)"""
+
+    def __init__(self, latency: Latency = None):
+        self.latency = latency or Latency()
+        self.counter = CallCounter()
+
+    def create(self, prompt: str, **kwargs):
+        self.counter.record(1)
+        self.latency.wait(1)
+        digest = hashlib.sha1(prompt.encode('utf-8')).hexdigest()[:16]
+        return SimpleNamespace(data=[SimpleNamespace(url=f"https://images.invalid/{digest}.png")])
@@ -0,0 +1,160 @@
+# Memory vs recall report for vector quantization
+"""
+Usage:
+    python -m benchmarks.quantization_report --collection default
+    python -m benchmarks.quantization_report --synthetic 20000 --dims 1536 --output report.json
+
+Reads the float32 vectors of an existing collection (or builds a synthetic
+corpus with the benchmark fake embeddings), holds out some of them as
+queries, and for each quantization setting reports bytes per vector, total
+index size, recall@k against exact search with and without full-precision
+re-ranking, and search latency. Stored vectors double as queries, so no
+embedding API calls are made.
+"""
+import argparse
+import json
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from config.settings import Settings
+from utils.vector_quantization import (
+    FullPrecisionVectors, build_index, bytes_per_vector, min_training_vectors, pq_subvectors
+)
+
+
+def collection_vectors(name: str) -> tuple:
+    """(stats, float32 vectors) of a saved collection, via the same stats RAGService.get_stats reports"""
+    from utils.vector_db import VectorCollection
+
+    collection = VectorCollection(name, embeddings=None)
+    if not collection.index_file.exists():
+        raise SystemExit(f"Collection {name!r} has no saved index")
+    collection.load()
+    stats = collection.get_stats()
+    index = collection.store.index
+    if collection.quantization == 'none':
+        vectors = index.reconstruct_n(0, index.ntotal)
+    else:
+        vectors = FullPrecisionVectors(collection.vectors_file, index.d).rows(slice(0, index.ntotal))
+    return stats, np.ascontiguousarray(vectors, dtype=np.float32)
+
+
+def synthetic_vectors(count: int, dims: int, seed: int = 13) -> np.ndarray:
+    from benchmarks.fakes import FakeEmbeddings
+    from benchmarks.suite import synthetic_text
+
+    rng = random.Random(seed)
+    embeddings = FakeEmbeddings(dims=dims)
+    return np.asarray(embeddings.embed_documents([synthetic_text(rng, 80) for _ in range(count)]), dtype=np.float32)
+
+
+def default_configs(dims: int) -> list:
+    """Exact, sq8 and a few PQ sizes (bytes per vector)"""
+    configs = [('none', None), ('sq8', None)]
+    for m in sorted({pq_subvectors(dims, dims // divisor) for divisor in (8, 16, 32) if dims // divisor}, reverse=True):
+        configs.append(('pq', m))
+    return configs
+
+
+def recall(found: np.ndarray, truth: np.ndarray) -> float:
+    k = truth.shape[1]
+    return float(np.mean([len(set(f[:k]) & set(t)) / k for f, t in zip(found, truth)]))
+
+
+def evaluate(vectors: np.ndarray, queries: np.ndarray, k: int, rerank_factor: int,
+             configs: list, pq_bits: int) -> list:
+    exact = build_index(vectors, 'none')
+    _, truth = exact.search(queries, k)
+
+    rows = []
+    with tempfile.TemporaryDirectory(prefix="quantization-report-") as tmp:
+        full_precision = FullPrecisionVectors(Path(tmp) / "vectors.f32", vectors.shape[1])
+        full_precision.write(0, vectors)
+
+        for method, pq_m in configs:
+            if len(vectors) < min_training_vectors(method, pq_bits):
+                print(f"Skipping {method}: needs at least {min_training_vectors(method, pq_bits)} vectors",
+                      file=sys.stderr)
+                continue
+            start = time.perf_counter()
+            index = build_index(vectors, method, pq_m, pq_bits)
+            build_s = time.perf_counter() - start
+
+            _, found = index.search(queries, k)
+            reranked, latencies = [], []
+            for query in queries:
+                start = time.perf_counter()
+                _, candidates = index.search(query.reshape(1, -1), k * rerank_factor)
+                if method != 'none':
+                    ids, _ = full_precision.rerank(query, candidates[0], k)
+                else:
+                    ids = candidates[0][:k]
+                latencies.append(time.perf_counter() - start)
+                reranked.append(ids)
+
+            vector_bytes = bytes_per_vector(index)
+            rows.append({
+                'method': method if pq_m is None else f"{method}{pq_m}x{pq_bits}",
+                'bytes_per_vector': vector_bytes,
+                'index_size': vector_bytes * index.ntotal,
+                'compression': (vectors.shape[1] * 4) / vector_bytes,
+                'recall': recall(found, truth),
+                'recall_reranked': recall(reranked, truth),
+                'search_p50_ms': statistics.median(latencies) * 1000,
+                'build_s': build_s,
+            })
+    return rows
+
+
+def print_table(rows: list, k: int):
+    print(f"{'method':<12}{'bytes/vec':>10}{'index MB':>10}{'ratio':>8}"
+          f"{f'recall@{k}':>11}{'reranked':>10}{'p50 ms':>9}")
+    for row in rows:
+        print(f"{row['method']:<12}{row['bytes_per_vector']:>10}{row['index_size'] / 2 ** 20:>10.2f}"
+              f"{row['compression']:>7.1f}x{row['recall']:>11.3f}{row['recall_reranked']:>10.3f}"
+              f"{row['search_p50_ms']:>9.2f}")
+
+
+def main(argv: list = None):
+    parser = argparse.ArgumentParser(description="Memory vs recall of vector quantization settings")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument('--collection', default=Settings.DEFAULT_COLLECTION, help="Collection to analyse")
+    source.add_argument('--synthetic', type=int, metavar='N', help="Use N synthetic vectors instead")
+    parser.add_argument('--dims', type=int, default=256, help="Dimensions of synthetic vectors")
+    parser.add_argument('--queries', type=int, default=200, help="Vectors held out as queries")
+    parser.add_argument('--k', type=int, default=Settings.RETRIEVAL_CANDIDATES)
+    parser.add_argument('--rerank-factor', type=int, default=Settings.RERANK_FACTOR)
+    parser.add_argument('--output', type=Path, help="Write the report as JSON here")
+    args = parser.parse_args(argv)
+
+    if args.synthetic:
+        stats = {'source': 'synthetic'}
+        vectors = synthetic_vectors(args.synthetic, args.dims)
+    else:
+        stats, vectors = collection_vectors(args.collection)
+        stats['source'] = args.collection
+
+    # Held-out queries: their own vectors are not in the index being searched
+    rng = np.random.default_rng(0)
+    order = rng.permutation(len(vectors))
+    held_out = min(args.queries, len(vectors) // 10)
+    if held_out == 0:
+        raise SystemExit("Need at least 10 vectors")
+    queries, corpus = vectors[order[:held_out]], vectors[order[held_out:]]
+
+    rows = evaluate(corpus, queries, min(args.k, len(corpus)), args.rerank_factor,
+                    default_configs(vectors.shape[1]), Settings.PQ_BITS)
+    print(json.dumps(stats, indent=2))
+    print_table(rows, args.k)
+    if args.output:
+        args.output.write_text(json.dumps({'stats': stats, 'k': args.k, 'results': rows}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
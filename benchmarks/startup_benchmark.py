@@ -0,0 +1,108 @@
+# Startup benchmark: module import time and time-to-first-render
+"""
+Usage:
+    python -m benchmarks.startup_benchmark [--runs 5] [--output results.json]
+
+Each measurement runs in a fresh interpreter so module caches from one run
+cannot hide the cost of the next.
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+IMPORT_SNIPPET = """
+import time
+start = time.perf_counter()
+import {module}
+print(time.perf_counter() - start)
+"""
+
+RENDER_SNIPPET = """
+import time
+from streamlit.testing.v1 import AppTest
+start = time.perf_counter()
+app = AppTest.from_file("app.py", default_timeout={timeout})
+app.run()
+elapsed = time.perf_counter() - start
+if app.exception:
+    raise SystemExit(str(app.exception))
+print(elapsed)
+"""
+
+# Modules whose import cost is reported individually
+MODULES = [
+    'app',
+    'services.rag_service',
+    'services.translation_service',
+    'services.tts_service',
+    'services.dalle_service',
+]
+
+
+def _run_snippet(code: str, env: dict = None) -> float:
+    result = subprocess.run(
+        [sys.executable, '-c', code],
+        cwd=BASE_DIR, capture_output=True, text=True, env=env
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip() or result.stdout.strip())
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def _summarize(samples: list) -> dict:
+    return {
+        'runs': len(samples),
+        'mean_s': statistics.mean(samples),
+        'median_s': statistics.median(samples),
+        'min_s': min(samples),
+        'max_s': max(samples),
+    }
+
+
+def measure_import_time(module: str, runs: int) -> dict:
+    """Time a cold import of ``module``"""
+    return _summarize([_run_snippet(IMPORT_SNIPPET.format(module=module)) for _ in range(runs)])
+
+
+def measure_first_render(runs: int, timeout: float = 60) -> dict:
+    """Time a full first script run of app.py under Streamlit's AppTest harness"""
+    return _summarize([_run_snippet(RENDER_SNIPPET.format(timeout=timeout)) for _ in range(runs)])
+
+
+def run(runs: int = 5) -> dict:
+    """
+    Run every startup measurement
+
+    A module that fails to import is reported and skipped; a failed first
+    render raises, since then there is no time-to-first-render to report.
+    """
+    results = {'imports': {}, 'first_render': None}
+    for module in MODULES:
+        try:
+            results['imports'][module] = measure_import_time(module, runs)
+        except RuntimeError as e:
+            results['imports'][module] = {'error': str(e)}
+    results['first_render'] = measure_first_render(runs)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure import time and time-to-first-render")
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--output', type=Path, help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    results = run(args.runs)
+    output = json.dumps(results, indent=2)
+    if args.output:
+        args.output.write_text(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,530 @@
+# Offline benchmark suite
+"""
+Usage:
+    python -m benchmarks.suite --output results.json
+    python -m benchmarks.suite --quick --latency-ms 2 --baseline benchmarks/baseline.json
+
+Every service runs against the deterministic fakes in benchmarks/fakes.py,
+so no network or API key is needed. All state (vector store, audio, image
+history) lives in a temporary directory.
+
+Results are written as JSON ({"meta": ..., "results": {benchmark: {metric: value}}}).
+With --baseline, each metric is compared against the baseline and the run
+exits with status 1 if any metric regressed by more than --tolerance.
+Metric direction follows its name: ``*_per_s`` and ``*hit_rate`` are higher
+is better, ``*_ms`` and ``*_s`` are lower is better, anything else is
+informational.
+"""
+import argparse
+import json
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+import traceback
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+from config.settings import Settings
+from benchmarks.fakes import (
+    FakeEmbeddings, FakeImageAPI, FakeTranslator, FakeTTS, Latency, make_fake_llm
+)
+
+VOCABULARY = (
+    "vector index query document chunk embedding retrieval answer model token latency "
+    "translation speech image cache batch shard memory recall prompt context summary "
+    "arabic english french spanish german knowledge base upload session analytics"
+).split()
+
+
+def percentile(samples: list, fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def latency_summary(samples: list) -> dict:
+    """p50/p95/mean of samples given in seconds, reported in milliseconds"""
+    return {
+        'p50_ms': statistics.median(samples) * 1000,
+        'p95_ms': percentile(samples, 0.95) * 1000,
+        'mean_ms': statistics.mean(samples) * 1000,
+        'samples': len(samples),
+    }
+
+
+def synthetic_text(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(VOCABULARY) for _ in range(words))
+
+
+@contextmanager
+def isolated_settings():
+    """Point every persisted path at a throwaway directory and start from empty caches"""
+    from utils.cache import set_back_tier
+
+    set_back_tier(None)
+    names = ['VECTOR_DB_PATH', 'COLLECTIONS_DIR', 'IMAGES_DIR', 'TEMP_AUDIO_DIR', 'DOCUMENTS_DIR', 'INGEST_CHECKPOINT']
+    saved = {name: getattr(Settings, name) for name in names}
+    with tempfile.TemporaryDirectory(prefix="ai-assistant-bench-") as tmp:
+        root = Path(tmp)
+        Settings.VECTOR_DB_PATH = root / "vector_db"
+        Settings.COLLECTIONS_DIR = root / "collections"
+        Settings.IMAGES_DIR = root / "generated_images"
+        Settings.TEMP_AUDIO_DIR = root / "temp_audio"
+        Settings.DOCUMENTS_DIR = root / "documents"
+        Settings.INGEST_CHECKPOINT = root / "ingest_checkpoint.jsonl"
+        try:
+            yield root
+        finally:
+            for name, value in saved.items():
+                setattr(Settings, name, value)
+
+
+def make_rag(latency: Latency):
+    from services.rag_service import RAGService
+    return RAGService(embeddings=FakeEmbeddings(latency=latency), llm=make_fake_llm(latency))
+
+
+def fill_corpus(rag, size: int, rng: random.Random, batch: int = 500):
+    from langchain.schema import Document
+
+    for start in range(0, size, batch):
+        chunks = [
+            Document(page_content=synthetic_text(rng, 80), metadata={'source': f"doc{start + i}"})
+            for i in range(min(batch, size - start))
+        ]
+        # Embed without injected latency; corpus construction is not what is being measured
+        vectors = FakeEmbeddings(dims=rag.embeddings.dims).embed_documents([c.page_content for c in chunks])
+        rag.add_chunks(chunks, vectors, save=False)
+
+
+def bench_retrieval(config: dict) -> dict:
+    """Similarity search latency as the corpus grows"""
+    results = {}
+    for size in config['corpus_sizes']:
+        with isolated_settings():
+            rng = random.Random(size)
+            rag = make_rag(Latency())
+            fill_corpus(rag, size, rng)
+            samples = []
+            for _ in range(config['queries']):
+                query = synthetic_text(rng, 6)
+                start = time.perf_counter()
+                rag.vector_store.similarity_search(query, k=4)
+                samples.append(time.perf_counter() - start)
+            results[f"n{size}"] = latency_summary(samples)
+    return results
+
+
+def bench_ingestion(config: dict) -> dict:
+    """Bulk ingestion throughput through batch_cli.ingest"""
+    from batch_cli import IngestCheckpoint, ingest
+
+    with isolated_settings() as root:
+        rng = random.Random(7)
+        corpus = root / "corpus"
+        corpus.mkdir()
+        for i in range(config['pages']):
+            # Roughly one printed page per file
+            (corpus / f"page{i:05d}.txt").write_text(synthetic_text(rng, 450), encoding='utf-8')
+
+        rag = make_rag(config['latency'])
+        report = ingest(rag, corpus, IngestCheckpoint(Settings.INGEST_CHECKPOINT),
+                        workers=config['workers'], log=lambda _: None)
+        return {
+            'pages_per_s': report['files_ingested'] / report['elapsed_s'],
+            'chunks_per_s': report['chunks_per_s'],
+            'chunks': report['chunks'],
+            'embedding_calls': rag.embeddings.counter.calls,
+        }
+
+
+def bench_embedding_batches(config: dict) -> dict:
+    """Texts embedded per second at different batch sizes"""
+    rng = random.Random(3)
+    texts = [synthetic_text(rng, 60) for _ in range(config['texts'])]
+    results = {}
+    for batch_size in config['batch_sizes']:
+        embeddings = FakeEmbeddings(latency=config['embedding_latency'])
+        start = time.perf_counter()
+        for i in range(0, len(texts), batch_size):
+            embeddings.embed_documents(texts[i:i + batch_size])
+        elapsed = time.perf_counter() - start
+        results[f"batch{batch_size}"] = {'texts_per_s': len(texts) / elapsed, 'calls': embeddings.counter.calls}
+    return results
+
+
+def bench_embedding_scheduler(config: dict) -> dict:
+    """
+    Query embedding latency and ingest throughput while both compete for a
+    provider that answers 429 above ``workers`` concurrent requests
+    """
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+    from utils.embedding_scheduler import BULK, INTERACTIVE, EmbeddingScheduler
+    from utils.remote_client import CircuitBreaker, RemoteCallError, RemoteClient, RetryPolicy
+
+    class RateLimitError(Exception):
+        status_code = 429
+
+    rng = random.Random(5)
+    # One list of chunk texts per ingested file
+    files = [[synthetic_text(rng, 60) for _ in range(8)] for _ in range(max(1, config['texts'] // 8))]
+    queries = [synthetic_text(rng, 8) for _ in range(config['queries'])]
+    latency = config['embedding_latency']
+    results = {}
+    for mode in ('direct', 'scheduled'):
+        backend = FakeEmbeddings(latency=Latency(max(latency.per_call, 0.002), latency.per_item))
+        capacity = threading.BoundedSemaphore(config['workers'])
+        rejected = []
+
+        def embed_batch(texts):
+            if not capacity.acquire(blocking=False):
+                rejected.append(len(texts))
+                raise RateLimitError("429 Too Many Requests")
+            try:
+                return backend.embed_documents(texts)
+            finally:
+                capacity.release()
+
+        # Same retry loop for both modes, and the breaker settings of the production openai client
+        backend_config = Settings.REMOTE_BACKENDS['openai']
+        client = RemoteClient('embeddings-bench', max_concurrency=config['workers'] * 4,
+                              retry=RetryPolicy(max_attempts=8, base_delay=0.005, max_delay=0.1),
+                              breaker=CircuitBreaker(failure_threshold=backend_config['failure_threshold'],
+                                                     reset_timeout=backend_config['reset_timeout']))
+        if mode == 'scheduled':
+            scheduler = EmbeddingScheduler(embed_batch, call=client.call, max_concurrency=config['workers'] * 2)
+            embed = lambda texts, priority: scheduler.embed(texts, priority)
+        else:
+            embed = lambda texts, priority: client.call(embed_batch, texts)
+
+        def attempt(texts, priority):
+            try:
+                embed(texts, priority)
+            except RemoteCallError:
+                failed.append(len(texts))
+
+        def ingest():
+            with ThreadPoolExecutor(max_workers=config['workers'] * 2) as pool:
+                list(pool.map(lambda texts: attempt(texts, BULK), files))
+            ingest_elapsed.append(time.perf_counter() - start)
+
+        latencies, ingest_elapsed, failed = [], [], []
+        start = time.perf_counter()
+        ingest_thread = threading.Thread(target=ingest)
+        ingest_thread.start()
+        for query in queries:
+            query_start = time.perf_counter()
+            attempt([query], INTERACTIVE)
+            latencies.append(time.perf_counter() - query_start)
+        ingest_thread.join()
+        results[mode] = {
+            'query_p50_ms': statistics.median(latencies) * 1000,
+            'query_p99_ms': percentile(latencies, 0.99) * 1000,
+            # Texts that failed after every retry are not counted as ingested
+            'ingest_texts_per_s': (sum(len(texts) for texts in files) - sum(failed)) / ingest_elapsed[0],
+            'calls': backend.counter.calls,
+            'rate_limited': len(rejected),
+            'failed_texts': sum(failed),
+        }
+    return results
+
+
+def bench_persistence(config: dict) -> dict:
+    """Cost of durably saving one change: write-ahead log vs rewriting the whole file every time"""
+    from langchain.schema import Document
+    from utils.durable_store import DurableJsonStore
+
+    def append(images, image):
+        images.append(image)
+        return images
+
+    results = {}
+    saved = Settings.WAL_CHECKPOINT_BYTES
+    for mode in ('rewrite', 'wal'):
+        with isolated_settings() as root:
+            # A checkpoint on every save is the full rewrite the stores did before the log
+            Settings.WAL_CHECKPOINT_BYTES = 0 if mode == 'rewrite' else saved
+            try:
+                rng = random.Random(11)
+                rag = make_rag(Latency())
+                fill_corpus(rag, config['corpus_size'], rng)
+                rag.save()
+                embeddings = FakeEmbeddings(dims=rag.embeddings.dims)
+                add_samples = []
+                for i in range(config['messages']):
+                    chunk = Document(page_content=synthetic_text(rng, 80), metadata={'source': f"new{i}"})
+                    vectors = embeddings.embed_documents([chunk.page_content])
+                    start = time.perf_counter()
+                    rag.add_chunks([chunk], vectors, save=True)
+                    add_samples.append(time.perf_counter() - start)
+            finally:
+                Settings.WAL_CHECKPOINT_BYTES = saved
+
+            history = DurableJsonStore(root / "history.json", apply=append, default=list,
+                                       checkpoint_every=1 if mode == 'rewrite' else None)
+            history.load()
+            history.state = [{'prompt': synthetic_text(rng, 12), 'url': f"https://img/{i}"}
+                             for i in range(config['corpus_size'])]
+            history.checkpoint()
+            history_samples = []
+            for i in range(config['messages']):
+                start = time.perf_counter()
+                history.update({'prompt': synthetic_text(rng, 12), 'url': f"https://img/new{i}"})
+                history_samples.append(time.perf_counter() - start)
+
+            results[mode] = {
+                'add_chunk_p50_ms': statistics.median(add_samples) * 1000,
+                'history_append_p50_ms': statistics.median(history_samples) * 1000,
+            }
+    return results
+
+
+def zipf_workload(rng: random.Random, unique: int, requests: int) -> list:
+    """Requests over ``unique`` keys with a skewed (Zipf-like) popularity"""
+    weights = [1.0 / (rank + 1) for rank in range(unique)]
+    return rng.choices(range(unique), weights=weights, k=requests)
+
+
+def bench_caches(config: dict) -> dict:
+    """How many translation/TTS requests are served without calling the backend"""
+    from services.translation_service import TranslationService
+    from services.tts_service import TTSService
+
+    rng = random.Random(11)
+    phrases = [synthetic_text(rng, 8) for _ in range(config['unique'])]
+    workload = zipf_workload(rng, len(phrases), config['requests'])
+    languages = list(Settings.SUPPORTED_LANGUAGES)
+    results = {}
+
+    with isolated_settings():
+        translator = FakeTranslator(latency=config['latency'])
+        service = TranslationService(translator=translator)
+        samples = []
+        for i, index in enumerate(workload):
+            start = time.perf_counter()
+            service.translate(phrases[index], languages[i % 2])
+            samples.append(time.perf_counter() - start)
+        results['translation'] = {
+            'hit_rate': 1 - translator.counter.calls / len(workload),
+            'mean_ms': statistics.mean(samples) * 1000,
+        }
+
+        engine = FakeTTS(latency=config['latency'])
+        service = TTSService(engine=engine)
+        samples = []
+        for index in workload:
+            start = time.perf_counter()
+            service.generate_speech(phrases[index], "English")
+            samples.append(time.perf_counter() - start)
+        results['tts'] = {
+            'hit_rate': 1 - engine.counter.calls / len(workload),
+            'mean_ms': statistics.mean(samples) * 1000,
+        }
+    return results
+
+
+def fill_documents(rag, documents: list, splitter, collection: str = None):
+    """Split whole documents the way uploads are split and index the chunks"""
+    from utils.file_processor import annotate_token_counts
+
+    chunks = annotate_token_counts(splitter.split_documents(documents))
+    vectors = FakeEmbeddings(dims=rag.embeddings.dims).embed_documents([c.page_content for c in chunks])
+    rag.add_chunks(chunks, vectors, save=False, collection=collection)
+
+
+def fixed_k_prompt_tokens(rag, documents: list, messages: list) -> float:
+    """Mean prompt tokens with the retrieval CONTEXT_TOKEN_BUDGET replaced: 3 chunks of up to 1000 characters"""
+    from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+    fill_documents(rag, documents, RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=200), "fixed_k")
+    saved = Settings.RETRIEVAL_CANDIDATES, Settings.CONTEXT_TOKEN_BUDGET
+    Settings.RETRIEVAL_CANDIDATES, Settings.CONTEXT_TOKEN_BUDGET = 3, 10 ** 9
+    calls, tokens = rag.llm.tokens.calls, rag.llm.tokens.items
+    try:
+        for message in messages:
+            rag.get_response(message, collections=["fixed_k"])
+    finally:
+        Settings.RETRIEVAL_CANDIDATES, Settings.CONTEXT_TOKEN_BUDGET = saved
+    return (rag.llm.tokens.items - tokens) / max(1, rag.llm.tokens.calls - calls)
+
+
+def bench_end_to_end(config: dict) -> dict:
+    """Full run_pipeline latency (what process_user_input does per message) and RAG prompt size"""
+    from langchain.schema import Document
+    from services.dalle_service import DalleService
+    from services.pipeline import run_pipeline
+    from services.translation_service import TranslationService
+    from services.tts_service import TTSService
+
+    latency = config['latency']
+    with isolated_settings():
+        rng = random.Random(5)
+        rag = make_rag(latency)
+        # Whole documents, so the prompt is made of the chunks real uploads produce
+        documents = [
+            Document(page_content=synthetic_text(rng, 600), metadata={'source': f"doc{i}"})
+            for i in range(config['corpus_size'] // 4)
+        ]
+        fill_documents(rag, documents, rag.text_splitter)
+        services = {
+            'translator': TranslationService(translator=FakeTranslator(latency=latency)),
+            'rag': rag,
+            'dalle': DalleService(image_api=FakeImageAPI(latency=latency)),
+            'tts': TTSService(engine=FakeTTS(latency=latency)),
+        }
+        samples = []
+        messages = []
+        for i in range(config['messages']):
+            message = synthetic_text(rng, 10)
+            if i % 5 == 0:
+                message = "draw " + message
+            messages.append(message)
+            start = time.perf_counter()
+            run_pipeline(services, message, "French")
+            samples.append(time.perf_counter() - start)
+        summary = latency_summary(samples)
+        summary['prompt_chars_mean'] = rag.llm.counter.items / max(1, rag.llm.counter.calls)
+        summary['prompt_tokens_mean'] = rag.llm.tokens.items / max(1, rag.llm.tokens.calls)
+        summary['fixed_k_prompt_tokens_mean'] = fixed_k_prompt_tokens(rag, documents, messages)
+    return summary
+
+
+def bench_startup(config: dict) -> dict:
+    """Cold import time of the entry points"""
+    from benchmarks.startup_benchmark import measure_import_time
+
+    results = {}
+    for module in ['app', 'api_server', 'services.rag_service']:
+        results[module.replace('.', '_')] = {
+            'import_s': measure_import_time(module, config['startup_runs'])['median_s']
+        }
+    return results
+
+
+BENCHMARKS = {
+    'retrieval': bench_retrieval,
+    'ingestion': bench_ingestion,
+    'embedding_batches': bench_embedding_batches,
+    'embedding_scheduler': bench_embedding_scheduler,
+    'caches': bench_caches,
+    'end_to_end': bench_end_to_end,
+    'persistence': bench_persistence,
+    'startup': bench_startup,
+}
+
+
+def make_config(quick: bool, latency_ms: float) -> dict:
+    latency = Latency(per_call=latency_ms / 1000)
+    return {
+        'latency': latency,
+        'embedding_latency': Latency(per_call=latency_ms / 1000, per_item=latency_ms / 50000),
+        'corpus_sizes': [100, 1000] if quick else [1000, 10000, 50000],
+        'queries': 50 if quick else 200,
+        'pages': 40 if quick else 400,
+        'workers': 4,
+        'texts': 256 if quick else 2048,
+        'batch_sizes': [1, 16, 64] if quick else [1, 16, 64, 256],
+        'unique': 20 if quick else 100,
+        'requests': 100 if quick else 1000,
+        'corpus_size': 200 if quick else 2000,
+        'messages': 20 if quick else 100,
+        'startup_runs': 1 if quick else 3,
+    }
+
+
+def run(names: list, config: dict) -> dict:
+    """Run the named benchmarks; a failing benchmark is reported, not raised"""
+    results = {}
+    for name in names:
+        print(f"Running {name}...", file=sys.stderr)
+        try:
+            results[name] = BENCHMARKS[name](config)
+        except Exception as e:
+            traceback.print_exc()
+            results[name] = {'error': f"{type(e).__name__}: {e}"}
+    return results
+
+
+def flatten(results: dict, prefix: str = "") -> dict:
+    flat = {}
+    for key, value in results.items():
+        name = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            flat.update(flatten(value, name))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = value
+    return flat
+
+
+def metric_direction(name: str) -> int:
+    """+1 if higher is better, -1 if lower is better, 0 if informational"""
+    if name.endswith('_per_s') or name.endswith('hit_rate'):
+        return 1
+    if name.endswith('_ms') or name.endswith('_s'):
+        return -1
+    return 0
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """
+    List metrics that regressed beyond ``tolerance`` (a fraction) relative to baseline
+
+    Returns:
+        List of dicts with metric, baseline, current and relative change
+    """
+    current = flatten(results)
+    regressions = []
+    for name, base_value in flatten(baseline).items():
+        direction = metric_direction(name)
+        if not direction or name not in current or not base_value:
+            continue
+        change = (current[name] - base_value) / abs(base_value)
+        if change * direction < -tolerance:
+            regressions.append({'metric': name, 'baseline': base_value, 'current': current[name], 'change': change})
+    return regressions
+
+
+def main(argv: list = None):
+    parser = argparse.ArgumentParser(description="Offline benchmark suite with fake backends")
+    parser.add_argument('--only', nargs='+', choices=list(BENCHMARKS), help="Benchmarks to run (default: all)")
+    parser.add_argument('--quick', action='store_true', help="Smaller workloads for CI")
+    parser.add_argument('--latency-ms', type=float, default=0.0, help="Injected latency per fake backend call")
+    parser.add_argument('--output', type=Path, help="Write results JSON here")
+    parser.add_argument('--baseline', type=Path, help="Results JSON to compare against")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="Allowed relative regression (default 0.2)")
+    args = parser.parse_args(argv)
+
+    config = make_config(args.quick, args.latency_ms)
+    document = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'quick': args.quick,
+            'latency_ms': args.latency_ms,
+        },
+        'results': run(args.only or list(BENCHMARKS), config),
+    }
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())
+        document['regressions'] = compare(document['results'], baseline.get('results', baseline), args.tolerance)
+
+    output = json.dumps(document, indent=2)
+    if args.output:
+        args.output.write_text(output)
+    print(output)
+
+    if document.get('regressions'):
+        for regression in document['regressions']:
+            print(f"REGRESSION {regression['metric']}: {regression['baseline']:.4g} -> "
+                  f"{regression['current']:.4g} ({regression['change']:+.1%})", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
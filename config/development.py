@@ -10,5 +10,6 @@ class DevelopmentSettings(Settings):
     DALLE_MODEL = "dall-e-2"
     
     # Smaller chunks for testing
-    CHUNK_SIZE = 500
-    CHUNK_OVERLAP = 100
\ No newline at end of file
+    CHUNK_TOKENS = 128
+    CHUNK_OVERLAP_TOKENS = 24
+    CONTEXT_TOKEN_BUDGET = Settings.CONTEXT_CHUNKS * CHUNK_TOKENS
\ No newline at end of file
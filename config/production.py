@@ -10,8 +10,9 @@ class ProductionSettings(Settings):
     DALLE_MODEL = "dall-e-3"
     
     # Optimized chunks for production
-    CHUNK_SIZE = 1500
-    CHUNK_OVERLAP = 300
+    CHUNK_TOKENS = 384
+    CHUNK_OVERLAP_TOKENS = 64
+    CONTEXT_TOKEN_BUDGET = Settings.CONTEXT_CHUNKS * CHUNK_TOKENS
     
     # Production security settings
     ALLOWED_HOSTS = ["your-domain.com", "www.your-domain.com"]
@@ -0,0 +1,77 @@
+# Assistant pipeline shared by the Streamlit UI and the headless API
+from typing import Callable
+from utils.lazy_loader import LazyService
+
+IMAGE_KEYWORDS = ['generate image', 'create picture', 'draw', 'صورة', 'رسم']
+
+
+def create_services() -> dict:
+    """Create lazy proxies for all AI services"""
+    return {
+        'whisper': LazyService("services.whisper_service:WhisperService"),
+        'translator': LazyService("services.translation_service:TranslationService"),
+        'rag': LazyService("services.rag_service:RAGService"),
+        'dalle': LazyService("services.dalle_service:DalleService"),
+        'tts': LazyService("services.tts_service:TTSService"),
+        'session': LazyService("utils.session_manager:SessionManager")
+    }
+
+
+def wants_image(user_input: str) -> bool:
+    """Whether the message asks for an image"""
+    text = user_input.lower()
+    return any(keyword in text for keyword in IMAGE_KEYWORDS)
+
+
+def run_pipeline(services: dict, user_input: str, target_language: str,
+                 enable_translation: bool = True, enable_rag: bool = True,
+                 enable_image_gen: bool = True, enable_tts: bool = True,
+                 on_step: Callable[[str, object], None] = None, history: str = None,
+                 collections: list = None, previous_query: str = None) -> dict:
+    """
+    Run a user message through translation, RAG, image generation and TTS
+
+    Args:
+        services: Service mapping as returned by create_services()
+        user_input: User message
+        target_language: Language name from Settings.SUPPORTED_LANGUAGES
+        on_step: Optional callback invoked as ``on_step(key, value)`` after each step
+        history: Earlier conversation (ConversationMemory.context_text()) for the RAG step
+        collections: Knowledge-base collections to search (default: the default collection)
+        previous_query: The user's previous message (ConversationMemory.last_user_message()),
+                        so the RAG step retrieves follow-ups together with it
+
+    Returns:
+        Response data with any of 'translation', 'rag_response', 'image', 'audio'
+    """
+    response_data = {}
+
+    def record(key, value):
+        response_data[key] = value
+        if on_step:
+            on_step(key, value)
+
+    # Step 1: Translation (if enabled)
+    if enable_translation and target_language != "English":
+        record('translation', services['translator'].translate(user_input, target_language))
+
+    # Step 2: RAG-enhanced response (if enabled)
+    if enable_rag:
+        record('rag_response', services['rag'].get_response(
+            user_input, history=history, collections=collections, previous_query=previous_query
+        ))
+
+    # Step 3: Image generation (if requested and enabled)
+    if enable_image_gen and wants_image(user_input):
+        image_url = services['dalle'].generate_image(user_input)
+        if image_url:
+            record('image', image_url)
+
+    # Step 4: Text-to-speech (if enabled)
+    if enable_tts:
+        final_response = response_data.get('rag_response', user_input)
+        audio_file = services['tts'].generate_speech(final_response, target_language)
+        if audio_file:
+            record('audio', audio_file)
+
+    return response_data
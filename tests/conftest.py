@@ -2,6 +2,18 @@ import pytest
 import tempfile
 import os
 from pathlib import Path
+from config.settings import Settings
+
+@pytest.fixture(autouse=True)
+def isolated_runtime_files(tmp_path, monkeypatch):
+    """Keep indexes, images, audio and analytics written by any test out of the source tree"""
+    monkeypatch.setattr(Settings, 'VECTOR_DB_PATH', tmp_path / "vector_db")
+    monkeypatch.setattr(Settings, 'COLLECTIONS_DIR', tmp_path / "collections")
+    monkeypatch.setattr(Settings, 'DOCUMENTS_DIR', tmp_path / "assets" / "documents")
+    monkeypatch.setattr(Settings, 'IMAGES_DIR', tmp_path / "assets" / "generated_images")
+    monkeypatch.setattr(Settings, 'TEMP_AUDIO_DIR', tmp_path / "assets" / "temp_audio")
+    monkeypatch.setattr(Settings, 'ANALYTICS_FILE', tmp_path / "assets" / "analytics.json")
+    monkeypatch.setattr(Settings, 'INGEST_CHECKPOINT', tmp_path / "ingest_checkpoint.jsonl")
 
 @pytest.fixture
 def temp_dir():
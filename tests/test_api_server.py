@@ -0,0 +1,70 @@
+import asyncio
+from unittest.mock import Mock
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from api_server import Backpressure, create_app
+
+@pytest.fixture
+def services():
+    services = {name: Mock() for name in ['whisper', 'translator', 'rag', 'dalle', 'tts', 'session']}
+    services['translator'].translate.return_value = "Bonjour"
+    services['rag'].get_response.return_value = "RAG answer"
+    services['rag'].add_document.return_value = True
+    services['dalle'].generate_image.return_value = "https://example.com/image.png"
+    services['whisper'].transcribe.return_value = "Hello world"
+    return services
+
+@pytest.fixture
+def client(services):
+    return TestClient(create_app(services))
+
+class TestAPIServer:
+    def test_chat_runs_pipeline(self, client, services):
+        response = client.post("/chat", json={"message": "Hello", "target_language": "French"})
+
+        assert response.status_code == 200
+        assert response.json() == {"translation": "Bonjour", "rag_response": "RAG answer"}
+        services['dalle'].generate_image.assert_not_called()
+
+    def test_chat_passes_history_to_rag(self, client, services):
+        history = [{"role": "user", "content": "Who wrote Dune?"}, {"role": "assistant", "content": "Frank Herbert."}]
+        client.post("/chat", json={"message": "When?", "target_language": "English", "history": history})
+
+        kwargs = services['rag'].get_response.call_args.kwargs
+        assert kwargs['history'] == "User: Who wrote Dune?\nAssistant: Frank Herbert."
+        assert kwargs['previous_query'] == "Who wrote Dune?"
+
+    def test_chat_rejects_unknown_language(self, client):
+        response = client.post("/chat", json={"message": "Hello", "target_language": "Klingon"})
+        assert response.status_code == 422
+
+    def test_upload_document(self, client, services):
+        response = client.post("/documents", files={"file": ("notes.txt", b"Some notes")})
+
+        assert response.status_code == 200
+        uploaded = services['rag'].add_document.call_args[0][0]
+        assert uploaded.name == "notes.txt"
+        assert uploaded.read() == b"Some notes"
+
+    def test_transcribe(self, client):
+        response = client.post("/transcribe", files={"file": ("clip.wav", b"RIFF")})
+        assert response.json() == {"text": "Hello world"}
+
+    def test_image_failure_returns_502(self, client, services):
+        services['dalle'].generate_image.return_value = None
+        response = client.post("/images", json={"prompt": "A sunset"})
+        assert response.status_code == 502
+
+def test_backpressure_rejects_when_saturated():
+    async def scenario():
+        backpressure = Backpressure(max_inflight=1, queue_timeout=0.01)
+        async with backpressure:
+            with pytest.raises(HTTPException) as excinfo:
+                async with backpressure:
+                    pass
+        return excinfo.value
+
+    error = asyncio.run(scenario())
+    assert error.status_code == 503
+    assert "Retry-After" in error.headers
@@ -0,0 +1,95 @@
+import io
+import json
+import threading
+from unittest.mock import Mock
+from batch_cli import IngestCheckpoint, ask, ingest, read_queries
+
+class FakeRAG:
+    """Stands in for RAGService: one chunk per file, records what was saved"""
+
+    def __init__(self, fail_on=None):
+        self.store_lock = threading.RLock()
+        self.pending = []
+        self.saved = []
+        self.fail_on = fail_on
+
+    def load_document(self, path, source=None):
+        if self.fail_on and path.name == self.fail_on:
+            raise ValueError("unreadable")
+        return [Mock(page_content=path.read_text(), metadata={'source': source})]
+
+    def embed_chunks(self, chunks):
+        return [[0.0] * 4 for _ in chunks]
+
+    def lock(self, collection=None):
+        return self.store_lock
+
+    def add_chunks(self, chunks, vectors=None, save=True, collection=None):
+        self.pending.extend(chunk.metadata['source'] for chunk in chunks)
+
+    def save(self, collection=None):
+        self.saved.extend(self.pending)
+        self.pending.clear()
+        return True
+
+def make_corpus(root, count):
+    (root / "nested").mkdir()
+    for i in range(count):
+        folder = root / "nested" if i % 2 else root
+        (folder / f"doc{i}.txt").write_text(f"Document {i}")
+    (root / "image.png").write_bytes(b"not a document")
+
+class TestIngest:
+    def test_ingests_tree_and_skips_checkpointed_files(self, temp_dir):
+        corpus = temp_dir / "corpus"
+        corpus.mkdir()
+        make_corpus(corpus, 5)
+        checkpoint_path = temp_dir / "checkpoint.jsonl"
+
+        rag = FakeRAG()
+        report = ingest(rag, corpus, IngestCheckpoint(checkpoint_path), workers=2, save_every=2, log=lambda _: None)
+        assert report['files_ingested'] == 5
+        assert sorted(rag.saved) == sorted(["doc0.txt", "nested/doc1.txt", "doc2.txt", "nested/doc3.txt", "doc4.txt"])
+
+        # A rerun with the same checkpoint has nothing left to do
+        rerun = ingest(FakeRAG(), corpus, IngestCheckpoint(checkpoint_path), log=lambda _: None)
+        assert rerun['files_skipped'] == 5
+        assert rerun['files_ingested'] == 0
+
+    def test_failed_files_are_not_checkpointed(self, temp_dir):
+        make_corpus(temp_dir, 3)
+        checkpoint = IngestCheckpoint(temp_dir / "checkpoint.jsonl")
+
+        report = ingest(FakeRAG(fail_on="doc2.txt"), temp_dir, checkpoint, log=lambda _: None)
+
+        assert report['files_failed'] == 1
+        assert not checkpoint.is_done(temp_dir / "doc2.txt")
+        assert checkpoint.is_done(temp_dir / "doc0.txt")
+
+    def test_checkpoint_ignores_torn_last_record(self, temp_dir):
+        (temp_dir / "done.txt").write_text("done")
+        path = temp_dir / "checkpoint.jsonl"
+        IngestCheckpoint(path).mark_done([(temp_dir / "done.txt", 1)])
+        with open(path, 'ab') as f:
+            f.write(b'0badc0de {"path": "b", "si')
+
+        reopened = IngestCheckpoint(path)
+        assert len(reopened.done) == 1
+        assert reopened.is_done(temp_dir / "done.txt")
+
+class TestAsk:
+    def test_runs_queries_and_reports_throughput(self, temp_dir):
+        query_file = temp_dir / "queries.jsonl"
+        query_file.write_text('{"id": "q1", "query": "What is RAG?"}\n\n"Plain string query"\n')
+        services = {'rag': Mock(), 'translator': Mock(), 'tts': Mock(), 'dalle': Mock()}
+        services['rag'].get_response.return_value = "An answer"
+        output = io.StringIO()
+
+        report = ask(services, read_queries(query_file), output, concurrency=2)
+
+        results = [json.loads(line) for line in output.getvalue().splitlines()]
+        assert report['queries'] == 2
+        assert report['failed'] == 0
+        assert {result['id'] for result in results} == {"q1", 3}
+        assert all(result['rag_response'] == "An answer" for result in results)
+        services['translator'].translate.assert_not_called()
@@ -0,0 +1,48 @@
+from benchmarks.fakes import FakeEmbeddings, FakeTranslator, Latency
+from benchmarks.quantization_report import evaluate, synthetic_vectors
+from benchmarks.suite import compare, metric_direction
+
+class TestFakes:
+    def test_embeddings_are_deterministic_and_similar_for_shared_words(self):
+        embeddings = FakeEmbeddings(dims=64)
+        first, same, other = embeddings.embed_documents(["vector index query", "vector index query", "speech image"])
+
+        assert first == same
+        similarity = sum(a * b for a, b in zip(first, same))
+        assert similarity > sum(a * b for a, b in zip(first, other))
+        assert embeddings.counter.calls == 1
+        assert embeddings.counter.items == 3
+
+    def test_translator_counts_calls(self):
+        translator = FakeTranslator(latency=Latency(per_call=0))
+        assert translator.translate("Hello", dest="fr").text == "[fr] Hello"
+        assert translator.counter.calls == 1
+
+class TestCompare:
+    def test_metric_direction_from_name(self):
+        assert metric_direction("ingestion.pages_per_s") == 1
+        assert metric_direction("caches.tts.hit_rate") == 1
+        assert metric_direction("retrieval.n1000.p95_ms") == -1
+        assert metric_direction("retrieval.n1000.samples") == 0
+
+    def test_flags_only_regressions_beyond_tolerance(self):
+        baseline = {'retrieval': {'p95_ms': 10.0, 'samples': 50}, 'ingestion': {'pages_per_s': 100.0}}
+        current = {'retrieval': {'p95_ms': 11.0, 'samples': 10}, 'ingestion': {'pages_per_s': 70.0}}
+
+        regressions = compare(current, baseline, tolerance=0.2)
+
+        assert [r['metric'] for r in regressions] == ['ingestion.pages_per_s']
+
+    def test_failed_benchmarks_are_skipped(self):
+        baseline = {'end_to_end': {'p50_ms': 5.0}}
+        assert compare({'end_to_end': {'error': 'ImportError'}}, baseline, tolerance=0.2) == []
+
+def test_quantization_report_measures_size_and_recall():
+    vectors = synthetic_vectors(300, dims=32)
+    rows = evaluate(vectors[20:], vectors[:20], k=4, rerank_factor=4,
+                    configs=[('none', None), ('sq8', None)], pq_bits=8)
+
+    exact, sq8 = rows
+    assert exact['recall'] == 1.0
+    assert (exact['bytes_per_vector'], sq8['bytes_per_vector']) == (128, 32)
+    assert sq8['recall_reranked'] >= sq8['recall']
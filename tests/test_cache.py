@@ -0,0 +1,114 @@
+import shutil
+import subprocess
+import time
+import pytest
+from utils.cache import LRUCache, RedisCache, TieredCache, VectorSerializer, SERIALIZERS, make_key
+
+class InMemoryRedis:
+    """Minimal stand-in for redis.Redis (get/set/delete with ex=)"""
+
+    def __init__(self):
+        self.data = {}
+        self.fail = False
+
+    def get(self, key):
+        if self.fail:
+            raise ConnectionError("redis down")
+        value, expires_at = self.data.get(key, (None, None))
+        if expires_at is not None and time.time() >= expires_at:
+            return None
+        return value
+
+    def set(self, key, value, ex=None):
+        if self.fail:
+            raise ConnectionError("redis down")
+        self.data[key] = (bytes(value), time.time() + ex if ex else None)
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+class TestLRUCache:
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(max_items=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+
+    def test_expires_entries(self):
+        cache = LRUCache(ttl=0.01)
+        cache.set("a", 1)
+        time.sleep(0.02)
+        assert cache.get("a") is None
+
+class TestTieredCache:
+    def test_second_instance_reads_shared_tier(self):
+        redis = InMemoryRedis()
+        first = TieredCache("translation", back=RedisCache(redis))
+        second = TieredCache("translation", back=RedisCache(redis))
+
+        first.set("k", "Bonjour")
+
+        assert second.get("k") == "Bonjour"
+        assert second.stats['back_hits'] == 1
+        # Promoted into the front tier
+        assert second.get("k") == "Bonjour"
+        assert second.stats['front_hits'] == 1
+
+    def test_vectors_stored_as_raw_float32(self):
+        redis = InMemoryRedis()
+        cache = TieredCache("embeddings", serializer=SERIALIZERS['vector'], back=RedisCache(redis))
+        vector = [0.5, -1.25, 3.0]
+
+        cache.set("v", vector)
+
+        stored = next(iter(redis.data.values()))[0]
+        assert len(stored) == 4 * len(vector)
+        assert TieredCache("embeddings", serializer=SERIALIZERS['vector'], back=RedisCache(redis)).get("v") == vector
+
+    def test_unavailable_redis_is_a_miss(self):
+        redis = InMemoryRedis()
+        redis.fail = True
+        cache = TieredCache("answers", back=RedisCache(redis))
+
+        cache.set("k", "value")
+        assert cache.get("k") == "value"
+        assert TieredCache("answers", back=RedisCache(redis)).get("k") is None
+
+    def test_get_or_set_computes_once(self):
+        cache = TieredCache("answers")
+        calls = []
+
+        for _ in range(3):
+            cache.get_or_set("k", lambda: calls.append(1) or "answer")
+
+        assert len(calls) == 1
+        assert cache.hit_rate() == pytest.approx(2 / 3)
+
+def test_make_key_is_stable_and_separates_parts():
+    assert make_key("en", "hello") == make_key("en", "hello")
+    assert make_key("en", "hello") != make_key("enh", "ello")
+
+@pytest.mark.skipif(shutil.which("redis-server") is None, reason="redis-server not installed")
+def test_against_local_redis_server():
+    redis = pytest.importorskip("redis")
+    server = subprocess.Popen(["redis-server", "--port", "6391", "--save", ""], stdout=subprocess.DEVNULL)
+    try:
+        client = redis.Redis(port=6391)
+        for _ in range(50):
+            try:
+                client.ping()
+                break
+            except redis.ConnectionError:
+                time.sleep(0.05)
+        cache = TieredCache("embeddings", serializer=VectorSerializer(), back=RedisCache(client), ttl=60)
+        cache.set("v", [1.0, 2.0])
+
+        assert TieredCache("embeddings", serializer=VectorSerializer(), back=RedisCache(client)).get("v") == [1.0, 2.0]
+    finally:
+        server.terminate()
+        server.wait()
@@ -0,0 +1,50 @@
+from langchain.schema import Document
+from utils.context_packer import pack_context
+from utils.file_processor import annotate_token_counts, count_tokens, make_text_splitter
+
+def chunk(text, tokens):
+    return Document(page_content=text, metadata={'tokens': tokens})
+
+class TestPackContext:
+    def test_fills_budget_in_relevance_order(self):
+        candidates = [chunk("first", 40), chunk("second", 70), chunk("third", 30), chunk("fourth", 20)]
+
+        packed = pack_context(candidates, budget=100)
+
+        # "second" does not fit after "first"; smaller chunks further down still do
+        assert [c.page_content for c in packed] == ["first", "third", "fourth"]
+
+    def test_skips_duplicates(self):
+        candidates = [
+            chunk("The index is  rebuilt nightly. It takes an hour.", 10),
+            chunk("the index is rebuilt nightly. it takes an hour.", 10),
+            chunk("It takes an hour.", 4),
+            chunk("Queries are cached.", 4),
+        ]
+
+        packed = pack_context(candidates, budget=100)
+
+        assert [c.page_content for c in packed] == [candidates[0].page_content, "Queries are cached."]
+
+    def test_counts_chunks_without_recorded_tokens(self):
+        legacy = Document(page_content="x" * 400, metadata={})
+
+        assert pack_context([legacy], budget=count_tokens("x" * 400) - 1) == []
+
+class TestTokenSplitter:
+    def test_chunks_respect_token_limit_and_record_counts(self):
+        splitter = make_text_splitter(chunk_tokens=20, overlap_tokens=0)
+        text = " ".join(f"word{i}" for i in range(200))
+
+        chunks = annotate_token_counts(splitter.create_documents([text]))
+
+        assert len(chunks) > 1
+        assert all(0 < c.metadata['tokens'] <= 20 for c in chunks)
+
+def test_every_config_budget_fits_the_chunks_it_replaced():
+    from config.development import DevelopmentSettings
+    from config.production import ProductionSettings
+    from config.settings import Settings
+
+    for config in [Settings, DevelopmentSettings, ProductionSettings]:
+        assert config.CONTEXT_TOKEN_BUDGET >= config.CONTEXT_CHUNKS * config.CHUNK_TOKENS, config.__name__
@@ -0,0 +1,67 @@
+from utils.conversation_memory import ConversationMemory, extractive_summarizer
+from utils.file_processor import count_tokens
+
+def add_turns(memory, turns):
+    for i in range(turns):
+        memory.add("user", f"Question {i}?")
+        memory.add("assistant", f"Answer {i}.", audio=f"/tmp/answer{i}.mp3")
+
+class TestConversationMemory:
+    def test_ring_buffer_is_bounded(self):
+        memory = ConversationMemory(max_messages=10, context_messages=4)
+        add_turns(memory, 50)
+
+        assert len(memory) == 10
+        assert memory.total == 100
+        assert memory.window(2) == [
+            {'role': 'user', 'content': "Question 49?"},
+            {'role': 'assistant', 'content': "Answer 49.", 'audio': "/tmp/answer49.mp3"},
+        ]
+        assert memory.has_older(5)
+        assert not memory.has_older(10)
+
+    def test_context_has_summary_and_recent_turns(self):
+        memory = ConversationMemory(context_messages=4, summarize_every=2)
+        add_turns(memory, 5)
+
+        context = memory.context_text(max_tokens=1000)
+
+        assert context.startswith("Earlier in the conversation:\nUser: Question 0?")
+        assert context.endswith("User: Question 4?\nAssistant: Answer 4.")
+        # Every message is either summarized or verbatim, none twice
+        assert context.count("Question 2?") == 1
+
+    def test_context_and_summary_stay_within_budget(self):
+        memory = ConversationMemory(context_messages=4, summary_tokens=40)
+        for i in range(200):
+            memory.add("user", f"Tell me about topic number {i} in a lot of detail please.")
+
+        assert count_tokens(memory.summary) <= 40
+        assert count_tokens(memory.context_text(max_tokens=60)) <= 60
+        assert "topic number 199" in memory.context_text(max_tokens=60)
+
+    def test_failing_summarizer_falls_back(self):
+        def broken(summary, messages, max_tokens):
+            raise RuntimeError("LLM unavailable")
+
+        memory = ConversationMemory(context_messages=2, summarize_every=1, summarizer=broken)
+        add_turns(memory, 3)
+
+        assert "Question 0?" in memory.summary
+
+    def test_placeholder_replies_are_shown_but_not_sent_to_the_model(self):
+        memory = ConversationMemory(context_messages=2, summarize_every=1)
+        memory.add("user", "Draw a cat\nwith a hat")
+        memory.add("assistant", "Response generated", in_context=False, image="https://example.com/cat.png")
+        memory.add("user", "Now a dog")
+        memory.add("assistant", "Response generated", in_context=False)
+
+        assert memory.window(1)[0]['content'] == "Response generated"
+        assert "Response generated" not in memory.context_text(max_tokens=1000)
+        assert "Response generated" not in memory.summary
+        assert memory.context_text(max_tokens=1000).endswith("User: Now a dog")
+        assert memory.last_user_message() == "Now a dog"
+
+def test_extractive_summarizer_keeps_first_sentence():
+    summary = extractive_summarizer("", [{'role': 'assistant', 'content': "Paris. It has many museums."}], 100)
+    assert summary == "Assistant: Paris."
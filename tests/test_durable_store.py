@@ -0,0 +1,119 @@
+import json
+import threading
+from utils.durable_store import DurableJsonStore, WriteAheadLog, atomic_write, atomic_write_json
+
+def count_events(state, op):
+    state['count'] += op['n']
+    return state
+
+def make_store(path, **kwargs):
+    return DurableJsonStore(path, apply=count_events, default=lambda: {'count': 0}, **kwargs)
+
+def test_atomic_write_replaces_without_leftovers(temp_dir):
+    target = temp_dir / "state.json"
+    atomic_write(target, "old")
+    atomic_write_json(target, {'new': True})
+
+    assert json.loads(target.read_text()) == {'new': True}
+    assert [path.name for path in temp_dir.iterdir()] == ["state.json"]
+
+class TestWriteAheadLog:
+    def test_torn_tail_is_dropped_and_repaired(self, temp_dir):
+        log = WriteAheadLog(temp_dir / "wal.log")
+        log.commit([{'n': 1}, {'n': 2}])
+        good_size = log.size()
+        with open(log.path, 'ab') as f:
+            f.write(b'0badc0de {"n": 3')  # crash in the middle of a write
+
+        records, offset = WriteAheadLog(log.path).replay(repair=True)
+
+        assert records == [{'n': 1}, {'n': 2}]
+        assert offset == good_size == log.size()
+
+    def test_corrupt_record_stops_replay(self, temp_dir):
+        log = WriteAheadLog(temp_dir / "wal.log")
+        log.commit([{'n': 1}, {'n': 2}, {'n': 3}])
+        data = log.path.read_bytes().replace(b'{"n":2}', b'{"n":9}')
+        log.path.write_bytes(data)
+
+        assert log.replay()[0] == [{'n': 1}]
+
+    def test_replay_from_offset(self, temp_dir):
+        log = WriteAheadLog(temp_dir / "wal.log")
+        log.commit([{'n': 1}])
+        _, offset = log.replay()
+        log.commit([{'n': 2}])
+
+        assert log.replay(offset)[0] == [{'n': 2}]
+
+    def test_concurrent_commits_share_fsyncs(self, temp_dir):
+        log = WriteAheadLog(temp_dir / "wal.log", group_commit_delay=0.02)
+        barrier = threading.Barrier(8)
+
+        def writer(i):
+            barrier.wait()
+            log.commit([{'n': i}])
+
+        threads = [threading.Thread(target=writer, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert sorted(record['n'] for record in log.replay()[0]) == list(range(8))
+        assert log.stats['appends'] == 8
+        assert log.stats['syncs'] < 8
+
+class TestDurableJsonStore:
+    def test_updates_survive_restart_without_snapshot_rewrite(self, temp_dir):
+        store = make_store(temp_dir / "counts.json", checkpoint_every=100)
+        store.load()
+        for _ in range(3):
+            store.update({'n': 1})
+
+        assert not store.path.exists()
+        assert make_store(store.path).load() == {'count': 3}
+
+    def test_checkpoint_rewrites_snapshot_and_empties_log(self, temp_dir):
+        store = make_store(temp_dir / "counts.json", checkpoint_every=2)
+        store.load()
+        for _ in range(5):
+            store.update({'n': 1})
+
+        assert json.loads(store.path.read_text()) == {'lsn': 4, 'data': {'count': 4}}
+        assert len(store.wal.replay()[0]) == 1
+        assert make_store(store.path).load() == {'count': 5}
+
+    def test_crash_before_log_is_emptied_does_not_apply_twice(self, temp_dir):
+        store = make_store(temp_dir / "counts.json", checkpoint_every=100)
+        store.load()
+        store.update({'n': 1})
+        store.update({'n': 2})
+        # Snapshot written, then the process died before resetting the log
+        atomic_write_json(store.path, {'lsn': 2, 'data': {'count': 3}})
+
+        assert make_store(store.path).load() == {'count': 3}
+
+    def test_reads_legacy_snapshot_and_other_writers(self, temp_dir):
+        path = temp_dir / "counts.json"
+        path.write_text(json.dumps({'count': 10}))
+        first, second = make_store(path), make_store(path)
+        first.load()
+        second.load()
+
+        first.update({'n': 1})
+
+        assert second.refresh() == {'count': 11}
+
+    def test_refresh_detects_checkpoint_when_log_is_back_to_the_same_size(self, temp_dir):
+        path = temp_dir / "counts.json"
+        first, second = make_store(path, checkpoint_every=2), make_store(path)
+        first.load()
+        second.load()
+
+        second.update({'n': 1})
+        first.update({'n': 1})  # checkpoint: the log is emptied
+        first.update({'n': 5})  # ...and refilled to the size second last saw
+
+        assert first.wal.size() == second._wal_offset
+        assert second.refresh() == {'count': 7}
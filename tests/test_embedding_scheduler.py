@@ -0,0 +1,120 @@
+import threading
+import time
+import pytest
+from utils.embedding_scheduler import BULK, INTERACTIVE, EmbeddingScheduler, ScheduledEmbeddings
+from utils.remote_client import is_rate_limited
+
+class RecordingBackend:
+    """embed_batch stand-in that records every request it receives"""
+
+    def __init__(self, delay=0.0, gate=None):
+        self.batches = []
+        self.delay = delay
+        self.gate = gate
+        self.lock = threading.Lock()
+
+    def __call__(self, texts):
+        if self.gate is not None:
+            self.gate.wait(5)
+        time.sleep(self.delay)
+        with self.lock:
+            self.batches.append(list(texts))
+        return [[float(len(text))] for text in texts]
+
+class RateLimitError(Exception):
+    status_code = 429
+
+def test_coalesces_concurrent_requests_into_batches():
+    gate = threading.Event()
+    backend = RecordingBackend(gate=gate)
+    # One bulk slot: texts queue up while the first request is in flight
+    scheduler = EmbeddingScheduler(backend, max_batch_items=4, max_wait=5, max_concurrency=2)
+
+    first = scheduler.submit(["first"])
+    time.sleep(0.05)
+    futures = [scheduler.submit([f"text {i}"]) for i in range(8)]
+    gate.set()
+    vectors = [future.result(5) for batch in futures for future in batch]
+
+    assert first[0].result(5) == [5.0]
+    assert vectors == [[6.0]] * 8
+    assert [len(batch) for batch in backend.batches] == [1, 4, 4]
+
+def test_token_limit_caps_batch_size():
+    backend = RecordingBackend()
+    scheduler = EmbeddingScheduler(backend, max_batch_items=100, max_batch_tokens=10, max_wait=0.01)
+
+    # 40 characters is about 10 tokens, so every text goes in its own request
+    scheduler.embed(["x" * 40, "y" * 40, "z" * 40])
+
+    assert [len(batch) for batch in backend.batches] == [1, 1, 1]
+
+def test_interactive_requests_go_before_queued_bulk():
+    gate = threading.Event()
+    backend = RecordingBackend(gate=gate)
+    scheduler = EmbeddingScheduler(backend, max_batch_items=1, max_wait=0, interactive_max_wait=0,
+                                   max_concurrency=1)
+
+    blocker = scheduler.submit(["first"], BULK)
+    time.sleep(0.05)
+    bulk = scheduler.submit(["bulk 1", "bulk 2"], BULK)
+    query = scheduler.submit(["query"], INTERACTIVE)
+    gate.set()
+
+    for future in blocker + bulk + query:
+        future.result(5)
+    assert [batch[0] for batch in backend.batches] == ["first", "query", "bulk 1", "bulk 2"]
+
+def test_rate_limit_halves_concurrency_and_success_recovers():
+    calls = []
+
+    def backend(texts):
+        calls.append(texts)
+        if len(calls) == 1:
+            raise RateLimitError("slow down")
+        return [[0.0] for _ in texts]
+
+    scheduler = EmbeddingScheduler(backend, max_wait=0, max_concurrency=8)
+    with pytest.raises(RateLimitError):
+        scheduler.embed(["a"])
+    assert scheduler.limit == 4
+    assert scheduler.stats['rate_limited'] == 1
+    assert scheduler.stats['failed'] == 1
+
+    scheduler.embed(["b"])
+    assert scheduler.limit == pytest.approx(4.25)
+    assert scheduler.stats['requests'] == 1
+
+def test_errors_reach_every_text_in_the_batch():
+    def backend(texts):
+        raise ValueError("bad input")
+
+    scheduler = EmbeddingScheduler(backend, max_batch_items=2, max_wait=0.2)
+    futures = scheduler.submit(["a", "b"])
+
+    for future in futures:
+        with pytest.raises(ValueError):
+            future.result(5)
+
+def test_is_rate_limited():
+    class OpenAIRateLimit(Exception):
+        pass
+    OpenAIRateLimit.__name__ = 'RateLimitError'
+
+    class Unavailable(Exception):
+        status_code = 503
+
+    assert is_rate_limited(RateLimitError())
+    assert is_rate_limited(OpenAIRateLimit())
+    assert not is_rate_limited(Unavailable())
+    assert not is_rate_limited(TimeoutError())
+
+def test_scheduled_embeddings_routes_queries_and_documents():
+    from benchmarks.fakes import FakeEmbeddings
+
+    fake = FakeEmbeddings(dims=8)
+    embeddings = ScheduledEmbeddings(fake)
+
+    assert embeddings.embed_documents(["one", "two"]) == fake.embed_documents(["one", "two"])
+    assert embeddings.embed_query("one") == fake.embed_query("one")
+    assert embeddings.dims == 8
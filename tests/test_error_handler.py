@@ -0,0 +1,66 @@
+import json
+import logging
+import sys
+from utils.logging_setup import JSONFormatter, RateLimitFilter, SizedTimedRotatingFileHandler
+
+def make_record(msg="Upstream timeout", level=logging.ERROR, exc_info=None):
+    return logging.LogRecord("test", level, __file__, 1, msg, (), exc_info)
+
+class TestRateLimitFilter:
+    def test_suppresses_repeats_within_window(self):
+        log_filter = RateLimitFilter(window=60)
+
+        assert log_filter.filter(make_record()) is True
+        assert log_filter.filter(make_record()) is False
+        assert log_filter.filter(make_record("Different error")) is True
+
+    def test_reports_suppressed_count_after_window(self):
+        log_filter = RateLimitFilter(window=0)
+        log_filter._seen[("test", logging.ERROR, "Upstream timeout", None)] = (0, 3)
+
+        record = make_record()
+        assert log_filter.filter(record) is True
+        assert record.suppressed_duplicates == 3
+
+    def test_info_records_always_pass(self):
+        log_filter = RateLimitFilter(window=60)
+        assert all(log_filter.filter(make_record(level=logging.INFO)) for _ in range(3))
+
+class TestJSONFormatter:
+    def test_includes_extra_fields_and_exception(self):
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            record = make_record(exc_info=sys.exc_info())
+        record.function = "generate_image"
+
+        payload = json.loads(JSONFormatter().format(record))
+        assert payload["level"] == "ERROR"
+        assert payload["function"] == "generate_image"
+        assert "ValueError: boom" in payload["exception"]
+
+class TestSizedTimedRotatingFileHandler:
+    def test_rolls_over_on_size(self, temp_dir):
+        handler = SizedTimedRotatingFileHandler(temp_dir / "app.log", max_bytes=100, backup_count=2, interval=3600)
+        for _ in range(10):
+            handler.emit(make_record("x" * 40))
+        handler.close()
+
+        assert (temp_dir / "app.log.1").exists()
+        assert not (temp_dir / "app.log.3").exists()
+
+def test_configure_logging_writes_per_process_file(temp_dir):
+    import utils.logging_setup as logging_setup
+
+    root = logging.getLogger()
+    handlers, level = list(root.handlers), root.level
+    logging_setup.configure_logging(temp_dir / "app.log", process_name="api-123")
+    try:
+        logging.getLogger("test").warning("worker started")
+        logging_setup.stop_logging()
+        assert json.loads((temp_dir / "app.api-123.log").read_text())['message'] == "worker started"
+        assert not (temp_dir / "app.log").exists()
+    finally:
+        root.handlers[:] = handlers
+        root.setLevel(level)
+        logging_setup.stop_logging()
@@ -0,0 +1,36 @@
+from utils.lazy_loader import LazyService, warm_up
+
+class Counter:
+    instances = 0
+
+    def __init__(self):
+        type(self).instances += 1
+        self.value = 42
+
+class TestLazyService:
+    def setup_method(self):
+        Counter.instances = 0
+
+    def test_constructs_on_first_use_only(self):
+        service = LazyService(Counter)
+        assert not service.is_loaded
+        assert Counter.instances == 0
+
+        assert service.value == 42
+        assert service.value == 42
+        assert service.is_loaded
+        assert Counter.instances == 1
+
+    def test_resolves_import_path(self):
+        service = LazyService("collections:OrderedDict")
+        assert service.get().__class__.__name__ == "OrderedDict"
+
+    def test_warm_up_builds_in_background_once(self):
+        services = {'counter': LazyService(Counter)}
+
+        thread = warm_up(services)
+        thread.join(timeout=5)
+
+        assert services['counter'].is_loaded
+        assert warm_up(services) is None
+        assert Counter.instances == 1
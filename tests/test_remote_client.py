@@ -0,0 +1,165 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from utils.remote_client import (
+    RemoteClient, RetryPolicy, CircuitBreaker, CircuitOpenError, RemoteCallError, is_retryable
+)
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Serves queued status codes, then 200"""
+    statuses = []
+    hits = 0
+
+    def do_GET(self):
+        type(self).hits += 1
+        status = type(self).statuses.pop(0) if type(self).statuses else 200
+        body = b"ok" if status == 200 else b"error"
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def stub_server():
+    StubHandler.statuses = []
+    StubHandler.hits = 0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+def make_client(**kwargs):
+    kwargs.setdefault("retry", RetryPolicy(max_attempts=3, base_delay=0.001))
+    return RemoteClient("stub", timeout=5, **kwargs)
+
+class TestRemoteClient:
+    def test_retries_server_errors(self, stub_server):
+        StubHandler.statuses = [503, 500]
+        response = make_client().request("GET", stub_server)
+
+        assert response.text == "ok"
+        assert StubHandler.hits == 3
+
+    def test_does_not_retry_client_errors(self, stub_server):
+        StubHandler.statuses = [404]
+        with pytest.raises(Exception) as excinfo:
+            make_client().request("GET", stub_server)
+
+        assert not isinstance(excinfo.value, RemoteCallError)
+        assert StubHandler.hits == 1
+
+    def test_gives_up_after_max_attempts(self, stub_server):
+        StubHandler.statuses = [503, 503, 503, 503]
+        with pytest.raises(RemoteCallError):
+            make_client().request("GET", stub_server)
+        assert StubHandler.hits == 3
+
+    def test_circuit_opens_and_fails_fast(self, stub_server):
+        StubHandler.statuses = [503] * 10
+        client = make_client(
+            retry=RetryPolicy(max_attempts=1),
+            breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60)
+        )
+        for _ in range(2):
+            with pytest.raises(RemoteCallError):
+                client.request("GET", stub_server)
+
+        with pytest.raises(CircuitOpenError):
+            client.request("GET", stub_server)
+        assert StubHandler.hits == 2
+
+    def test_rate_limits_are_retried_without_opening_circuit(self, stub_server):
+        StubHandler.statuses = [429] * 4
+        client = make_client(
+            retry=RetryPolicy(max_attempts=5, base_delay=0.001),
+            breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60)
+        )
+
+        assert client.request("GET", stub_server).status_code == 200
+        assert client.breaker.state == CircuitBreaker.CLOSED
+        assert client.breaker.failures == 0
+
+    def test_half_open_success_closes_circuit(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+        breaker.record_failure()
+
+        assert breaker.allow()
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        breaker.record_success()
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_client_error_in_half_open_trial_closes_circuit(self, stub_server):
+        StubHandler.statuses = [503, 400, 200]
+        client = make_client(
+            retry=RetryPolicy(max_attempts=1),
+            breaker=CircuitBreaker(failure_threshold=1, reset_timeout=0)
+        )
+        with pytest.raises(RemoteCallError):
+            client.request("GET", stub_server)
+        assert client.breaker.state == CircuitBreaker.OPEN
+
+        # The trial call is rejected, but the backend answered
+        with pytest.raises(Exception) as rejected:
+            client.request("GET", stub_server)
+        assert not isinstance(rejected.value, CircuitOpenError)
+        assert client.breaker.state == CircuitBreaker.CLOSED
+        assert client.request("GET", stub_server).status_code == 200
+
+    def test_busy_slots_do_not_leave_circuit_half_open(self):
+        client = RemoteClient("stub", max_concurrency=1, timeout=0.05, retry=RetryPolicy(max_attempts=1),
+                              breaker=CircuitBreaker(failure_threshold=1, reset_timeout=0))
+        client.breaker.record_failure()
+
+        # The only slot is taken when the breaker would start its half-open trial
+        client._slots.acquire()
+        with pytest.raises(RemoteCallError) as busy:
+            client.call(lambda: "ok")
+        client._slots.release()
+
+        assert not isinstance(busy.value, CircuitOpenError)
+        assert client.breaker.state == CircuitBreaker.OPEN
+        assert client.call(lambda: "ok") == "ok"
+        assert client.breaker.state == CircuitBreaker.CLOSED
+
+    def test_interrupted_half_open_trial_reopens_circuit(self):
+        client = make_client(retry=RetryPolicy(max_attempts=1),
+                             breaker=CircuitBreaker(failure_threshold=1, reset_timeout=0))
+        client.breaker.record_failure()
+
+        def interrupted():
+            raise KeyboardInterrupt
+
+        with pytest.raises(KeyboardInterrupt):
+            client.call(interrupted)
+        assert client.breaker.state == CircuitBreaker.OPEN
+        assert client.call(lambda: "ok") == "ok"
+
+    def test_hedged_call_returns_faster_attempt(self):
+        calls = []
+
+        def backend():
+            calls.append(time.monotonic())
+            if len(calls) == 1:
+                time.sleep(0.5)
+                return "slow"
+            return "fast"
+
+        assert make_client().hedged_call(backend, hedge_delay=0.05) == "fast"
+        assert len(calls) == 2
+
+def test_is_retryable_uses_status_then_type_name():
+    class RateLimitError(Exception):
+        pass
+
+    class BadRequest(Exception):
+        status_code = 400
+
+    assert is_retryable(RateLimitError())
+    assert is_retryable(TimeoutError())
+    assert not is_retryable(BadRequest())
+    assert not is_retryable(ValueError())
@@ -0,0 +1,222 @@
+import pytest
+from langchain.schema import Document
+from benchmarks.fakes import FakeEmbeddings, make_fake_llm
+from config.settings import Settings
+from utils.cache import set_back_tier
+from utils.vector_db import CollectionManager, list_collections, validate_collection_name
+
+@pytest.fixture
+def isolated_store(temp_dir, monkeypatch):
+    monkeypatch.setattr(Settings, 'VECTOR_DB_PATH', temp_dir / "vector_db")
+    monkeypatch.setattr(Settings, 'COLLECTIONS_DIR', temp_dir / "collections")
+    set_back_tier(None)
+    return temp_dir
+
+def chunks(*texts):
+    return [Document(page_content=text, metadata={'source': text}) for text in texts]
+
+def test_validate_collection_name():
+    assert validate_collection_name("team-docs_2") == "team-docs_2"
+    for name in ["", "../etc", "a/b", "-leading", "x" * 65]:
+        with pytest.raises(ValueError):
+            validate_collection_name(name)
+
+class TestCollectionManager:
+    def test_evicts_least_recently_used_and_reloads(self, isolated_store):
+        manager = CollectionManager(FakeEmbeddings(dims=16), max_loaded=2)
+        for name in ["alpha", "beta", "gamma"]:
+            collection = manager.get(name)
+            embeddings = collection.embeddings.embed_documents([f"{name} notes"])
+            collection.add([(f"{name} notes", embeddings[0])], [{'source': name}], save=False)
+
+        # alpha was unloaded, and its unsaved additions saved first
+        assert manager.loaded() == ["beta", "gamma"]
+        assert (Settings.COLLECTIONS_DIR / "alpha" / "index.faiss").exists()
+        assert list_collections() == ["alpha", "beta", "gamma"]
+        assert manager.get("alpha").search("alpha notes", k=1)[0][0].page_content == "alpha notes"
+        assert manager.loaded() == ["gamma", "alpha"]
+
+    def test_unloaded_collections_are_dropped(self, isolated_store):
+        manager = CollectionManager(FakeEmbeddings(dims=16), max_loaded=1)
+        for i in range(20):
+            manager.get(f"c{i}").search("query", k=1)
+
+        assert list(manager._collections) == ["c19"]
+
+    def test_missing_collection_is_empty(self, isolated_store):
+        manager = CollectionManager(FakeEmbeddings(dims=16))
+        assert manager.get("nothing-here").search("query", k=3) == []
+        assert manager.get("nothing-here").get_stats()['chunk_count'] == 0
+
+class TestRAGRouting:
+    def test_searches_only_selected_collections_and_merges(self, isolated_store):
+        from services.rag_service import RAGService
+
+        rag = RAGService(embeddings=FakeEmbeddings(dims=64), llm=make_fake_llm())
+        rag.add_chunks(chunks("billing invoices are sent monthly"), collection="finance")
+        rag.add_chunks(chunks("deploys happen every tuesday"), collection="engineering")
+
+        finance_only = rag.retrieve_context("when are invoices sent", ["finance"])
+        assert [chunk.page_content for chunk in finance_only] == ["billing invoices are sent monthly"]
+
+        both = rag.retrieve_context("when are invoices sent and deploys", ["finance", "engineering"])
+        assert {chunk.page_content for chunk in both} == {
+            "billing invoices are sent monthly", "deploys happen every tuesday"
+        }
+        # The default collection (welcome text) was not searched
+        assert all("Welcome" not in chunk.page_content for chunk in both)
+        assert rag.get_stats("finance")['chunk_count'] == 1
+
+    def test_stats_of_unknown_collection_create_nothing(self, isolated_store):
+        from services.rag_service import RAGService
+
+        rag = RAGService(embeddings=FakeEmbeddings(dims=16), llm=make_fake_llm())
+
+        assert rag.get_stats("no-such-collection")['chunk_count'] == 0
+        assert rag.retrieve_context("query", ["no-such-collection"]) == []
+        assert "Answer" in rag.get_response("query", collections=["no-such-collection"])
+        assert not Settings.COLLECTIONS_DIR.exists()
+
+class TestQuantization:
+    def test_full_precision_rewrite_keeps_later_rows(self, temp_dir):
+        import numpy as np
+        from utils.vector_quantization import FullPrecisionVectors
+
+        vectors = FullPrecisionVectors(temp_dir / "vectors.f32", 4)
+        vectors.write(0, np.ones((10, 4)))
+        # Rows 2.. were written by another process; rewriting rows 0-1 must not drop them
+        FullPrecisionVectors(vectors.path, 4).write(0, np.zeros((2, 4)))
+
+        assert len(vectors) == 10
+        assert vectors.rows(np.arange(10)).sum() == 8 * 4
+
+    def test_quantized_collection_reranks_from_full_precision_copy(self, isolated_store, monkeypatch):
+        monkeypatch.setattr(Settings, 'VECTOR_QUANTIZATION', 'sq8')
+        monkeypatch.setattr(Settings, 'QUANTIZE_MIN_VECTORS', 50)
+        embeddings = FakeEmbeddings(dims=32)
+        texts = [f"note {i} about topic{i} and subject{i % 7}" for i in range(60)]
+        manager = CollectionManager(embeddings)
+        collection = manager.get("notes")
+        collection.add(list(zip(texts, embeddings.embed_documents(texts))), [{} for _ in texts])
+
+        stats = collection.get_stats()
+        assert stats['quantization'] == 'sq8'
+        assert stats['bytes_per_vector'] == 32
+        assert stats['index_size'] == 32 * 60
+        assert stats['full_precision_size'] == 4 * 32 * 60
+
+        # Additions after quantization get full-precision rows too
+        collection.add([("note 60 about topic60", embeddings.embed_query("note 60 about topic60"))], [{}])
+        reloaded = CollectionManager(embeddings).get("notes")
+        chunk, distance = reloaded.search("note 60 about topic60", k=1)[0]
+        assert reloaded.quantization == 'sq8'
+        assert chunk.page_content == "note 60 about topic60"
+        assert distance == pytest.approx(0.0, abs=1e-5)
+
+    def test_dequantizing_keeps_full_precision_copy_until_saved(self, isolated_store, monkeypatch):
+        monkeypatch.setattr(Settings, 'VECTOR_QUANTIZATION', 'sq8')
+        monkeypatch.setattr(Settings, 'QUANTIZE_MIN_VECTORS', 50)
+        embeddings = FakeEmbeddings(dims=32)
+        texts = [f"note {i}" for i in range(60)]
+        collection = CollectionManager(embeddings).get("notes")
+        collection.add(list(zip(texts, embeddings.embed_documents(texts))), [{} for _ in texts])
+
+        monkeypatch.setattr(Settings, 'VECTOR_QUANTIZATION', 'none')
+        collection.quantize('none')
+        # A crash now must leave the saved sq8 index something to re-rank from
+        assert collection.vectors_file.exists()
+
+        assert collection.save()
+        assert not collection.vectors_file.exists()
+        assert CollectionManager(embeddings).get("notes").get_stats()['quantization'] == 'none'
+
+    def test_stays_exact_below_threshold(self, isolated_store, monkeypatch):
+        monkeypatch.setattr(Settings, 'VECTOR_QUANTIZATION', 'pq')
+        embeddings = FakeEmbeddings(dims=32)
+        collection = CollectionManager(embeddings).get("small")
+        collection.add([("one note", embeddings.embed_query("one note"))], [{}])
+
+        assert collection.get_stats()['bytes_per_vector'] == 4 * 32
+        assert not collection.vectors_file.exists()
+
+class TestDurability:
+    def add(self, collection, *texts):
+        embeddings = collection.embeddings
+        collection.add(list(zip(texts, embeddings.embed_documents(list(texts)))), [{} for _ in texts])
+
+    def test_additions_are_logged_not_rewritten(self, isolated_store):
+        embeddings = FakeEmbeddings(dims=16)
+        collection = CollectionManager(embeddings).get("notes")
+        self.add(collection, "first note")
+        index_mtime = collection.loaded_mtime
+        self.add(collection, "second note")
+        self.add(collection, "third note")
+
+        # Only the first save wrote index files; later additions went to the log
+        assert collection.loaded_mtime == index_mtime
+        assert collection.get_stats()['wal_size'] > 0
+        reopened = CollectionManager(embeddings).get("notes")
+        assert reopened.get_stats()['chunk_count'] == 3
+        assert reopened.search("third note", k=1)[0][0].page_content == "third note"
+
+    def test_recovers_torn_log_and_interrupted_checkpoint(self, isolated_store, monkeypatch):
+        embeddings = FakeEmbeddings(dims=16)
+        collection = CollectionManager(embeddings).get("notes")
+        self.add(collection, "first note")
+        self.add(collection, "second note")
+        with open(collection.wal.path, 'ab') as f:
+            f.write(b'12345678 {"ids": ["torn')
+
+        # A checkpoint that committed its snapshot but died before moving it into place
+        def crash(self):
+            raise SystemExit("killed")
+        with monkeypatch.context() as patched, pytest.raises(SystemExit):
+            patched.setattr(type(collection), '_finish_checkpoint', crash)
+            collection._checkpoint()
+        assert (collection.path / ".snapshot").exists()
+
+        reopened = CollectionManager(embeddings).get("notes")
+        assert reopened.get_stats()['chunk_count'] == 2
+        assert not (collection.path / ".snapshot").exists()
+        # The torn record was cut off; the rest stays until the next checkpoint but is not applied twice
+        assert [record['texts'] for record in reopened.wal.replay()[0]] == [["second note"]]
+        assert reopened.wal.path.read_bytes().endswith(b"\n")
+
+def test_searches_run_safely_alongside_additions(isolated_store):
+    import threading
+
+    embeddings = FakeEmbeddings(dims=16)
+    writer = CollectionManager(embeddings).get("shared")
+    # A second instance, as in another worker, replays the first one's log from its search path
+    reader = CollectionManager(embeddings).get("shared")
+    writer.add([("seed text", embeddings.embed_query("seed text"))], [{}])
+    errors = []
+    done = threading.Event()
+
+    def search(collection):
+        while not done.is_set():
+            try:
+                for chunk, _ in collection.search("text number", k=4):
+                    assert chunk.page_content
+            except Exception as e:
+                errors.append(e)
+                return
+
+    def add():
+        try:
+            for i in range(100):
+                texts = [f"text number {i} part {j}" for j in range(20)]
+                writer.add(list(zip(texts, embeddings.embed_documents(texts))), [{} for _ in texts], save=False)
+        finally:
+            done.set()
+
+    threads = [threading.Thread(target=search, args=(collection,)) for collection in [writer, reader] * 2]
+    threads.append(threading.Thread(target=add))
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    reader.refresh_if_stale()
+    assert reader.get_stats()['chunk_count'] == 2001
@@ -0,0 +1,257 @@
+# Two-tier cache: in-process LRU in front of an optional shared Redis
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable
+
+from config.settings import Settings
+from utils.remote_client import CircuitBreaker
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class JSONSerializer:
+    """For strings, dicts and lists"""
+
+    def dumps(self, value) -> bytes:
+        return json.dumps(value, ensure_ascii=False).encode('utf-8')
+
+    def loads(self, data: bytes):
+        return json.loads(data.decode('utf-8'))
+
+
+class VectorSerializer:
+    """Embedding vectors as raw little-endian float32 bytes (4 bytes per dimension, no JSON)"""
+
+    def dumps(self, value) -> bytes:
+        import numpy as np
+        return np.asarray(value, dtype='<f4').tobytes()
+
+    def loads(self, data: bytes) -> list:
+        import numpy as np
+        return np.frombuffer(data, dtype='<f4').tolist()
+
+
+class BytesSerializer:
+    """For binary payloads such as audio"""
+
+    def dumps(self, value: bytes) -> bytes:
+        return bytes(value)
+
+    def loads(self, data: bytes) -> bytes:
+        return data
+
+
+SERIALIZERS = {
+    'json': JSONSerializer(),
+    'vector': VectorSerializer(),
+    'bytes': BytesSerializer(),
+}
+
+
+def make_key(*parts) -> str:
+    """Fixed-length cache key from arbitrary key parts"""
+    raw = '\x1f'.join(str(part) for part in parts)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+class LRUCache:
+    """Thread-safe in-process LRU with optional per-entry TTL"""
+
+    def __init__(self, max_items: int = 1024, ttl: float = None):
+        self.max_items = max_items
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            value, expires_at = entry
+            if expires_at is not None and time.monotonic() >= expires_at:
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value, ttl: float = None):
+        ttl = ttl if ttl is not None else self.ttl
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_items:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class RedisCache:
+    """
+    Shared back tier on any client with redis-py's get/set/delete interface.
+
+    Cache errors never fail a request: they are logged, treated as misses,
+    and a circuit breaker stops trying while the server is unreachable.
+    """
+
+    def __init__(self, client, prefix: str = "ai-assistant"):
+        self.client = client
+        self.prefix = prefix
+        self.breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30)
+
+    def _key(self, namespace: str, key: str) -> str:
+        return f"{self.prefix}:{namespace}:{key}"
+
+    def get(self, namespace: str, key: str):
+        if not self.breaker.allow():
+            return None
+        try:
+            data = self.client.get(self._key(namespace, key))
+        except Exception as e:
+            self.breaker.record_failure()
+            logger.warning("Redis get failed: %s", e)
+            return None
+        self.breaker.record_success()
+        return data
+
+    def set(self, namespace: str, key: str, data: bytes, ttl: float = None):
+        if not self.breaker.allow():
+            return
+        try:
+            self.client.set(self._key(namespace, key), data, ex=int(ttl) if ttl else None)
+        except Exception as e:
+            self.breaker.record_failure()
+            logger.warning("Redis set failed: %s", e)
+            return
+        self.breaker.record_success()
+
+    def delete(self, namespace: str, key: str):
+        try:
+            self.client.delete(self._key(namespace, key))
+        except Exception as e:
+            logger.warning("Redis delete failed: %s", e)
+
+
+class TieredCache:
+    """
+    One cache namespace: LRU front tier, optional shared back tier.
+
+    Front-tier values are kept as Python objects; only the back tier
+    serializes, using the namespace's serializer.
+    """
+
+    def __init__(self, namespace: str, serializer=None, front: LRUCache = None,
+                 back: RedisCache = None, ttl: float = None):
+        self.namespace = namespace
+        self.serializer = serializer or SERIALIZERS['json']
+        self.front = front or LRUCache(ttl=ttl)
+        self.back = back
+        self.ttl = ttl
+        self.stats = {'front_hits': 0, 'back_hits': 0, 'misses': 0}
+
+    def get(self, key: str, default=None):
+        value = self.front.get(key, _MISSING)
+        if value is not _MISSING:
+            self.stats['front_hits'] += 1
+            return value
+
+        if self.back is not None:
+            data = self.back.get(self.namespace, key)
+            if data is not None:
+                try:
+                    value = self.serializer.loads(data)
+                except Exception as e:
+                    logger.warning("Discarding undecodable %s cache entry: %s", self.namespace, e)
+                else:
+                    self.stats['back_hits'] += 1
+                    self.front.set(key, value)
+                    return value
+
+        self.stats['misses'] += 1
+        return default
+
+    def set(self, key: str, value, ttl: float = None):
+        ttl = ttl if ttl is not None else self.ttl
+        self.front.set(key, value, ttl)
+        if self.back is not None:
+            self.back.set(self.namespace, key, self.serializer.dumps(value), ttl)
+
+    def delete(self, key: str):
+        self.front.delete(key)
+        if self.back is not None:
+            self.back.delete(self.namespace, key)
+
+    def get_or_set(self, key: str, compute: Callable[[], Any], ttl: float = None):
+        """Return the cached value, computing and storing it on a miss; None results are not cached"""
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = compute()
+            if value is not None:
+                self.set(key, value, ttl)
+        return value
+
+    def hit_rate(self) -> float:
+        lookups = sum(self.stats.values())
+        return (self.stats['front_hits'] + self.stats['back_hits']) / lookups if lookups else 0.0
+
+
+_back_tier = _MISSING
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_back_tier():
+    """Shared Redis tier from Settings.REDIS_URL, or None when not configured"""
+    global _back_tier
+    if _back_tier is _MISSING:
+        _back_tier = None
+        if Settings.REDIS_URL:
+            try:
+                import redis
+                client = redis.Redis.from_url(
+                    Settings.REDIS_URL, socket_timeout=Settings.REDIS_TIMEOUT,
+                    socket_connect_timeout=Settings.REDIS_TIMEOUT
+                )
+                _back_tier = RedisCache(client)
+            except ImportError:
+                logger.warning("REDIS_URL is set but the redis package is not installed; using in-process cache only")
+    return _back_tier
+
+
+def set_back_tier(back: RedisCache = None):
+    """Replace the shared back tier (e.g. with an in-memory stand-in) and reset all caches"""
+    global _back_tier
+    with _caches_lock:
+        _back_tier = back
+        _caches.clear()
+
+
+def get_cache(namespace: str) -> TieredCache:
+    """Get the process-wide cache for a namespace configured in Settings.CACHE_NAMESPACES"""
+    with _caches_lock:
+        if namespace not in _caches:
+            config = Settings.CACHE_NAMESPACES.get(namespace, {})
+            _caches[namespace] = TieredCache(
+                namespace,
+                serializer=SERIALIZERS[config.get('serializer', 'json')],
+                front=LRUCache(max_items=config.get('max_items', 1024), ttl=config.get('ttl')),
+                back=get_back_tier() if config.get('shared', True) else None,
+                ttl=config.get('ttl')
+            )
+        return _caches[namespace]
@@ -0,0 +1,46 @@
+# Embeddings wrapper backed by the shared cache
+from langchain.embeddings.base import Embeddings
+from utils.cache import TieredCache, make_key
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Serve repeated texts from the 'embeddings' cache.
+
+    Cache misses in a batch are embedded together in a single call to the
+    wrapped embeddings, so caching never increases the number of API calls.
+    """
+
+    def __init__(self, embeddings: Embeddings, cache: TieredCache, model: str = None):
+        self.embeddings = embeddings
+        self.cache = cache
+        # Vectors from different models must never be mixed
+        self.model = model or getattr(embeddings, 'model', type(embeddings).__name__)
+
+    def _key(self, text: str) -> str:
+        return make_key(self.model, text)
+
+    def embed_documents(self, texts: list) -> list:
+        keys = [self._key(text) for text in texts]
+        vectors = [self.cache.get(key) for key in keys]
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        if missing:
+            computed = self.embeddings.embed_documents([texts[i] for i in missing])
+            for i, vector in zip(missing, computed):
+                vectors[i] = vector
+                self.cache.set(keys[i], vector)
+        return vectors
+
+    def embed_query(self, text: str) -> list:
+        key = self._key(text)
+        vector = self.cache.get(key)
+        if vector is None:
+            vector = self.embeddings.embed_query(text)
+            self.cache.set(key, vector)
+        return vector
+
+    def __getattr__(self, item):
+        # Expose attributes of the wrapped embeddings (e.g. dims on the benchmark fake)
+        if item.startswith('_') or item in ('embeddings', 'cache', 'model'):
+            raise AttributeError(item)
+        return getattr(self.embeddings, item)
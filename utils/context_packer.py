@@ -0,0 +1,50 @@
+# Fit retrieved chunks into the prompt's token budget
+import re
+
+from utils.file_processor import count_tokens
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def _normalize(text: str) -> str:
+    return _WHITESPACE.sub(" ", text).strip().lower()
+
+
+def chunk_tokens(chunk) -> int:
+    """Token count recorded at index time, counted now for chunks indexed before it was recorded"""
+    tokens = chunk.metadata.get('tokens')
+    if tokens is None:
+        tokens = count_tokens(chunk.page_content)
+    return tokens
+
+
+def pack_context(candidates: list, budget: int) -> list:
+    """
+    Select chunks for the prompt
+
+    Candidates are taken in order (best first). A chunk is skipped if its
+    text duplicates, or is contained in, a chunk already selected, or if it
+    does not fit in what is left of the budget; smaller chunks further down
+    the list may still fill the remainder.
+
+    Args:
+        candidates: Retrieved chunk documents, most relevant first
+        budget: Maximum total tokens of the selected chunks
+
+    Returns:
+        Selected chunks in relevance order
+    """
+    selected = []
+    selected_texts = []
+    remaining = budget
+    for chunk in candidates:
+        tokens = chunk_tokens(chunk)
+        if tokens > remaining:
+            continue
+        text = _normalize(chunk.page_content)
+        if not text or any(text in other for other in selected_texts):
+            continue
+        selected.append(chunk)
+        selected_texts.append(text)
+        remaining -= tokens
+    return selected
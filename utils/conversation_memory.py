@@ -0,0 +1,165 @@
+# Bounded chat history with a rolling summary of older turns
+import re
+from collections import deque
+from itertools import islice
+from typing import Callable, Iterable
+
+from config.settings import Settings
+from utils.file_processor import count_tokens
+
+_SENTENCE_END = re.compile(r"(?<=[.!?؟])\s")
+
+# Message fields worth keeping; anything else a caller passes in is dropped
+MESSAGE_FIELDS = ('role', 'content', 'translation', 'image', 'audio')
+
+
+def shorten(text: str, max_words: int = 30) -> str:
+    """First sentence of ``text``, cut to ``max_words`` words"""
+    sentence = _SENTENCE_END.split(text.strip(), maxsplit=1)[0]
+    words = sentence.split()
+    return " ".join(words[:max_words]) + (" ..." if len(words) > max_words else "")
+
+
+def extractive_summarizer(summary: str, messages: list, max_tokens: int) -> str:
+    """
+    Default summarizer: append one short line per message and drop the
+    oldest lines once the summary exceeds ``max_tokens``
+
+    Makes no API calls, so it is cheap enough to run on every turn.
+    """
+    lines = summary.splitlines() if summary else []
+    lines += [f"{message['role'].capitalize()}: {shorten(message['content'])}" for message in messages]
+    while len(lines) > 1 and count_tokens("\n".join(lines)) > max_tokens:
+        lines.pop(0)
+    return "\n".join(lines)
+
+
+class ConversationMemory:
+    """
+    Chat history for one conversation
+
+    Messages live in a ring buffer of ``max_messages`` entries for display.
+    The newest ``context_messages`` are sent to the model verbatim; older
+    ones are folded into a rolling summary of at most ``summary_tokens``
+    tokens, ``summarize_every`` messages at a time, so both memory use and
+    prompt size stay bounded however long the session runs.
+
+    ``summarizer(summary, messages, max_tokens) -> str`` can be replaced,
+    e.g. with an LLM call; the default is extractive.
+    """
+
+    def __init__(self, max_messages: int = None, context_messages: int = None,
+                 summary_tokens: int = None, summarize_every: int = None,
+                 summarizer: Callable[[str, list, int], str] = None):
+        self.context_messages = context_messages or Settings.MEMORY_CONTEXT_MESSAGES
+        # The buffer must hold at least the verbatim context plus the message leaving it
+        self.max_messages = max(max_messages or Settings.MEMORY_MAX_MESSAGES, self.context_messages + 1)
+        self.summary_tokens = summary_tokens or Settings.MEMORY_SUMMARY_TOKENS
+        self.summarize_every = summarize_every or Settings.MEMORY_SUMMARIZE_EVERY
+        self.summarizer = summarizer or extractive_summarizer
+        self.messages = deque(maxlen=self.max_messages)
+        self.summary = ""
+        self.total = 0  # messages ever added, including those evicted from the buffer
+        # Messages that have left the verbatim context but are not summarized yet
+        self._pending = []
+
+    @classmethod
+    def from_messages(cls, messages: Iterable[dict], **kwargs) -> "ConversationMemory":
+        memory = cls(**kwargs)
+        for message in messages:
+            memory.add(message['role'], message['content'])
+        return memory
+
+    def add(self, role: str, content: str, in_context: bool = True, **extras) -> dict:
+        """
+        Append a message
+
+        Args:
+            role: 'user' or 'assistant'
+            content: Message text
+            in_context: False for messages that are only displayed, such as a
+                        placeholder reply, and never sent to the model
+            extras: Optional 'translation', 'image' (URL) or 'audio' (file path)
+
+        Returns:
+            The stored message
+        """
+        message = {'role': role, 'content': content, **extras}
+        message = {key: message[key] for key in MESSAGE_FIELDS if message.get(key)}
+        message['role'] = role
+        message['content'] = content or ""
+        if not in_context:
+            message['in_context'] = False
+        self.messages.append(message)
+        self.total += 1
+
+        # The message that just dropped out of the verbatim context window
+        if self.total > self.context_messages:
+            leaving = self._context_message(self.total - self.context_messages - 1)
+            if leaving:
+                self._pending.append(leaving)
+            if len(self._pending) >= self.summarize_every:
+                self._summarize_pending()
+        return message
+
+    def _context_message(self, index: int) -> dict:
+        """Role and content of the message with absolute index ``index``; None if it is kept out of context"""
+        message = self.messages[index - (self.total - len(self.messages))]
+        if message.get('in_context') is False:
+            return None
+        return {'role': message['role'], 'content': message['content']}
+
+    def _summarize_pending(self):
+        try:
+            self.summary = self.summarizer(self.summary, self._pending, self.summary_tokens)
+        except Exception as e:
+            print(f"Conversation summary error: {e}")
+            # Fall back so pending messages never accumulate without bound
+            self.summary = extractive_summarizer(self.summary, self._pending, self.summary_tokens)
+        self._pending = []
+
+    def window(self, count: int) -> list:
+        """The ``count`` most recent messages, oldest first"""
+        if count <= 0:
+            return []
+        return list(islice(self.messages, max(0, len(self.messages) - count), None))
+
+    def has_older(self, count: int) -> bool:
+        """Whether messages older than window(count) are still available to render"""
+        return len(self.messages) > count
+
+    def context_text(self, max_tokens: int = None) -> str:
+        """
+        Conversation context for the model: the rolling summary followed by
+        the recent messages, trimmed oldest first to ``max_tokens``
+        """
+        max_tokens = max_tokens or Settings.HISTORY_TOKEN_BUDGET
+        recent = self._pending + [
+            message for message in (
+                self._context_message(i) for i in range(max(0, self.total - self.context_messages), self.total)
+            ) if message
+        ]
+        lines = [f"{message['role'].capitalize()}: {message['content']}" for message in recent]
+        summary = [f"Earlier in the conversation:\n{self.summary}"] if self.summary else []
+
+        while lines and count_tokens("\n".join(summary + lines)) > max_tokens:
+            lines.pop(0)
+        if summary and count_tokens("\n".join(summary + lines)) > max_tokens:
+            summary = []
+        return "\n".join(summary + lines)
+
+    def last_user_message(self) -> str:
+        """Content of the most recent user message, or "" if there is none"""
+        for message in reversed(self.messages):
+            if message['role'] == 'user':
+                return message['content']
+        return ""
+
+    def clear(self):
+        self.messages.clear()
+        self.summary = ""
+        self.total = 0
+        self._pending = []
+
+    def __len__(self):
+        return len(self.messages)
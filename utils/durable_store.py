@@ -0,0 +1,323 @@
+# Crash-safe persistence: atomic file replacement and write-ahead logging
+"""
+Every file the app persists goes through this module so that a crash
+(or power loss) at any point leaves either the old or the new state on
+disk, never a torn file.
+
+- atomic_write() writes a temporary file next to the target, fsyncs it and
+  renames it over the target.
+- WriteAheadLog appends checksummed records; a torn final record left by a
+  crash is detected and dropped on recovery. fsync is shared by concurrent
+  writers (group commit): one flush makes every record appended before it
+  durable.
+- DurableJsonStore keeps a JSON document as a snapshot plus a log of the
+  operations applied since, so each change costs one small append instead
+  of rewriting the whole file. The snapshot is rewritten (checkpointed)
+  every Settings.WAL_CHECKPOINT_RECORDS operations.
+
+Writers in different processes must hold a shared FileLock around appends,
+checkpoints and recovery.
+"""
+import json
+import os
+import re
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Callable
+
+from config.settings import Settings
+from utils.file_lock import FileLock
+
+
+def fsync_dir(path: Path):
+    """Make a rename or file creation in directory ``path`` durable (no-op where unsupported)"""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:  # Windows cannot open directories
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def fsync_file(path: Path):
+    with open(path, 'rb+') as f:
+        os.fsync(f.fileno())
+
+
+def atomic_write(path: Path, data, encoding: str = 'utf-8'):
+    """Replace ``path`` with ``data`` (str or bytes) so that readers see the old or the new content, never a mix"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.tmp-{os.getpid()}-{threading.get_ident()}")
+    if isinstance(data, str):
+        data = data.encode(encoding)
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    fsync_dir(path.parent)
+
+
+def atomic_write_json(path: Path, value, indent: int = 2):
+    atomic_write(path, json.dumps(value, indent=indent))
+
+
+class WriteAheadLog:
+    """
+    Append-only log of JSON records, one checksummed line each
+
+    append() only writes; sync() makes appended records durable. Threads
+    calling sync() at the same time share a single fsync.
+    """
+
+    def __init__(self, path: Path, group_commit_delay: float = None):
+        """
+        Args:
+            path: Log file
+            group_commit_delay: Seconds the syncing thread waits for more
+                                records to join its fsync (default Settings.WAL_GROUP_COMMIT_DELAY)
+        """
+        self.path = Path(path)
+        self.group_commit_delay = (Settings.WAL_GROUP_COMMIT_DELAY if group_commit_delay is None
+                                   else group_commit_delay)
+        self.stats = {'appends': 0, 'syncs': 0}
+        self._fd = None
+        self._cond = threading.Condition()
+        self._appended = 0
+        self._synced = 0
+        self._syncing = False
+
+    @staticmethod
+    def _encode(record) -> bytes:
+        payload = json.dumps(record, separators=(',', ':')).encode('utf-8')
+        return b"%08x %s\n" % (zlib.crc32(payload), payload)
+
+    def _file(self) -> int:
+        if self._fd is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            created = not self.path.exists()
+            self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT | getattr(os, 'O_BINARY', 0), 0o644)
+            if created:
+                fsync_dir(self.path.parent)
+        return self._fd
+
+    def append(self, records: list) -> int:
+        """Write records (not yet durable); returns a ticket for sync()"""
+        data = b"".join(self._encode(record) for record in records)
+        with self._cond:
+            # One write per call, so records of concurrent appenders never interleave
+            os.write(self._file(), data)
+            self._appended += 1
+            self.stats['appends'] += 1
+            return self._appended
+
+    def sync(self, ticket: int = None):
+        """Block until the records of ``ticket`` (default: everything appended so far) are on disk"""
+        with self._cond:
+            ticket = self._appended if ticket is None else ticket
+            while self._synced < ticket:
+                if not self._syncing:
+                    self._syncing = True
+                    break
+                # Another thread's fsync is in progress; it may cover this ticket
+                self._cond.wait()
+            else:
+                return
+        try:
+            if self.group_commit_delay:
+                time.sleep(self.group_commit_delay)
+            with self._cond:
+                target = self._appended
+                fd = self._file()
+            os.fsync(fd)
+            with self._cond:
+                self._synced = max(self._synced, target)
+                self.stats['syncs'] += 1
+        finally:
+            with self._cond:
+                self._syncing = False
+                self._cond.notify_all()
+
+    def commit(self, records: list):
+        """Append records and wait until they are durable"""
+        self.sync(self.append(records))
+
+    def size(self) -> int:
+        try:
+            return self.path.stat().st_size
+        except OSError:
+            return 0
+
+    def replay(self, start: int = 0, repair: bool = False) -> tuple:
+        """
+        Records from byte offset ``start`` on
+
+        Reading stops at the first incomplete or corrupt record: the tail a
+        crash left behind, or a record another process is still writing.
+
+        Args:
+            start: Offset returned by a previous replay()
+            repair: Truncate the log after the last valid record; only safe
+                    while holding the writers' lock
+
+        Returns:
+            (records, offset just past the last valid record)
+        """
+        try:
+            with open(self.path, 'rb') as f:
+                f.seek(start)
+                data = f.read()
+        except FileNotFoundError:
+            return [], 0
+        records, offset = [], start
+        for line in data.splitlines(keepends=True):
+            if not line.endswith(b"\n") or len(line) < 10 or line[8:9] != b" ":
+                break
+            payload = line[9:-1]
+            try:
+                if int(line[:8], 16) != zlib.crc32(payload):
+                    break
+                record = json.loads(payload)
+            except ValueError:
+                break
+            records.append(record)
+            offset += len(line)
+        if repair and offset < start + len(data):
+            with self._cond:
+                with open(self.path, 'rb+') as f:
+                    f.truncate(offset)
+                    os.fsync(f.fileno())
+        return records, offset
+
+    def reset(self):
+        """Empty the log once its records are in a durable snapshot"""
+        with self._cond:
+            if self.path.exists():
+                with open(self.path, 'rb+') as f:
+                    f.truncate(0)
+                    os.fsync(f.fileno())
+            self._synced = self._appended
+
+    def close(self):
+        """Close the file handle; the next append() reopens it"""
+        with self._cond:
+            # An fsync in progress is still using the descriptor
+            while self._syncing:
+                self._cond.wait()
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+
+
+# The snapshot's LSN, which json.dumps writes before its data
+_SNAPSHOT_LSN = re.compile(rb'^\{\s*"lsn":\s*(\d+)\s*,')
+
+
+class DurableJsonStore:
+    """
+    JSON document persisted as a snapshot file plus a log of operations
+
+    ``apply(state, op)`` must return the new state; it runs once per
+    operation, both when it is made and when the log is replayed on load.
+    The snapshot records how many operations it contains, so a crash
+    between rewriting it and emptying the log never applies one twice.
+    Snapshots written before this store existed (the bare document) are
+    read as-is.
+    """
+
+    def __init__(self, path: Path, apply: Callable[[Any, dict], Any], default: Callable[[], Any],
+                 lock: FileLock = None, checkpoint_every: int = None):
+        """
+        Args:
+            path: Snapshot file; the log is kept next to it as <name>.wal
+            apply: Applies one operation to the state
+            default: Returns the state to start from when nothing is saved
+            lock: Shared by every process writing this store
+            checkpoint_every: Operations between snapshot rewrites (default Settings.WAL_CHECKPOINT_RECORDS)
+        """
+        self.path = Path(path)
+        self.apply = apply
+        self.default = default
+        self.lock = lock or FileLock(self.path.with_name(f"{self.path.name}.lock"))
+        self.checkpoint_every = checkpoint_every or Settings.WAL_CHECKPOINT_RECORDS
+        self.wal = WriteAheadLog(self.path.with_name(f"{self.path.name}.wal"))
+        self.state = default()
+        self.lsn = 0
+        self._snapshot_lsn = 0
+        self._wal_offset = 0
+
+    def load(self):
+        """Read the snapshot and replay the log, dropping a torn final record"""
+        with self.lock:
+            self.state, self.lsn = self.default(), 0
+            if self.path.exists():
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    snapshot = json.load(f)
+                if isinstance(snapshot, dict) and set(snapshot) == {'lsn', 'data'}:
+                    self.state, self.lsn = snapshot['data'], snapshot['lsn']
+                else:
+                    self.state = snapshot
+            self._snapshot_lsn = self.lsn
+            records, self._wal_offset = self.wal.replay(0, repair=True)
+            self._apply_records(records)
+        return self.state
+
+    def _apply_records(self, records: list):
+        for record in records:
+            # Already in the snapshot (crash before the log was emptied)
+            if record['lsn'] <= self.lsn:
+                continue
+            self.state = self.apply(self.state, record['op'])
+            self.lsn = record['lsn']
+
+    def _saved_snapshot_lsn(self) -> int:
+        """LSN of the snapshot on disk, read from the start of the file; 0 if none or a legacy snapshot"""
+        try:
+            with open(self.path, 'rb') as f:
+                match = _SNAPSHOT_LSN.match(f.read(64))
+        except FileNotFoundError:
+            return 0
+        return int(match.group(1)) if match else 0
+
+    def refresh(self):
+        """Pick up changes saved by other processes since the last load"""
+        # Another process's checkpoint raises the snapshot's LSN and empties the log
+        if self._saved_snapshot_lsn() != self._snapshot_lsn or self.wal.size() < self._wal_offset:
+            self.load()
+        elif self.wal.size() > self._wal_offset:
+            records, self._wal_offset = self.wal.replay(self._wal_offset)
+            self._apply_records(records)
+        return self.state
+
+    def update(self, op: dict):
+        """Apply ``op`` and make it durable before returning"""
+        with self.lock:
+            self.refresh()
+            self.state = self.apply(self.state, op)
+            self.lsn += 1
+            ticket = self.wal.append([{'lsn': self.lsn, 'op': op}])
+            self._wal_offset = self.wal.size()
+            if self.lsn - self._snapshot_lsn >= self.checkpoint_every:
+                self.checkpoint()
+        # Outside the lock, so concurrent writers share one fsync
+        self.wal.sync(ticket)
+        return self.state
+
+    def checkpoint(self):
+        """Rewrite the snapshot from the current state and empty the log"""
+        with self.lock:
+            atomic_write_json(self.path, {'lsn': self.lsn, 'data': self.state})
+            self.wal.reset()
+            self._snapshot_lsn = self.lsn
+            self._wal_offset = 0
@@ -0,0 +1,197 @@
+# Priority scheduling and micro-batching of embedding requests
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable
+
+from langchain.embeddings.base import Embeddings
+
+from config.settings import Settings
+from utils.file_processor import estimate_tokens
+from utils.remote_client import is_rate_limited
+
+INTERACTIVE = 0
+BULK = 1
+
+
+class _Job:
+    __slots__ = ('text', 'tokens', 'future', 'deadline')
+
+    def __init__(self, text: str, deadline: float):
+        self.text = text
+        self.tokens = estimate_tokens(text)
+        self.future = Future()
+        self.deadline = deadline
+
+
+class EmbeddingScheduler:
+    """
+    Queue embedding requests and send them to the backend in micro-batches
+
+    - Two priorities: INTERACTIVE (queries) always go before BULK (ingest),
+      and one request slot is kept free for interactive work.
+    - Queued texts of the same priority are coalesced into one request of
+      up to ``max_batch_items`` texts / ``max_batch_tokens`` tokens. A batch
+      is sent when it is full, when no request is in flight, or when its
+      oldest text has waited ``max_wait`` (``interactive_max_wait`` for
+      queries).
+    - Requests in flight adapt to the backend: every rate-limit response
+      halves the limit, every success raises it by 1/limit (AIMD), between
+      ``min_concurrency`` and ``max_concurrency``.
+    """
+
+    def __init__(self, embed_batch: Callable[[list], list], call: Callable = None,
+                 max_batch_items: int = None, max_batch_tokens: int = None,
+                 max_wait: float = None, interactive_max_wait: float = None,
+                 max_concurrency: int = None, min_concurrency: int = 1):
+        """
+        Args:
+            embed_batch: Embeds a list of texts, e.g. Embeddings.embed_documents
+            call: Runs each backend request, e.g. RemoteClient.call for retries
+        """
+        self.embed_batch = embed_batch
+        self.call = call or (lambda func, *args, **kwargs: func(*args, **kwargs))
+        self.max_batch_items = max_batch_items or Settings.EMBED_BATCH_SIZE
+        self.max_batch_tokens = max_batch_tokens or Settings.EMBED_BATCH_TOKENS
+        self.max_wait = {
+            INTERACTIVE: interactive_max_wait if interactive_max_wait is not None else Settings.EMBED_INTERACTIVE_MAX_WAIT,
+            BULK: max_wait if max_wait is not None else Settings.EMBED_MAX_WAIT,
+        }
+        self.max_concurrency = max_concurrency or Settings.EMBED_MAX_CONCURRENCY
+        self.min_concurrency = min_concurrency
+        self.limit = float(self.max_concurrency)
+        self.stats = {'requests': 0, 'texts': 0, 'rate_limited': 0, 'failed': 0}
+
+        self._queues = {INTERACTIVE: deque(), BULK: deque()}
+        self._queued_tokens = {INTERACTIVE: 0, BULK: 0}
+        self._inflight = 0
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="embed")
+        self._dispatcher = None
+
+    def submit(self, texts: list, priority: int = BULK) -> list:
+        """Queue texts for embedding; returns one Future per text"""
+        deadline = time.monotonic() + self.max_wait[priority]
+        jobs = [_Job(text, deadline) for text in texts]
+        with self._cond:
+            if self._dispatcher is None:
+                self._dispatcher = threading.Thread(target=self._dispatch, name="embed-dispatcher", daemon=True)
+                self._dispatcher.start()
+            self._queues[priority].extend(jobs)
+            self._queued_tokens[priority] += sum(job.tokens for job in jobs)
+            self._cond.notify_all()
+        return [job.future for job in jobs]
+
+    def embed(self, texts: list, priority: int = BULK) -> list:
+        """Embed texts, blocking until all their batches have been answered"""
+        return [future.result() for future in self.submit(texts, priority)]
+
+    def _slots(self, priority: int) -> int:
+        limit = int(self.limit)
+        # Keep one slot free so a burst of ingest cannot hold up queries
+        return limit if priority == INTERACTIVE or limit == 1 else limit - 1
+
+    def _ready(self, priority: int, now: float) -> bool:
+        queue = self._queues[priority]
+        # With nothing in flight there is no response to coalesce behind, so waiting only adds latency
+        return (self._inflight == 0 or len(queue) >= self.max_batch_items
+                or self._queued_tokens[priority] >= self.max_batch_tokens or now >= queue[0].deadline)
+
+    def _take_batch(self, priority: int) -> list:
+        queue = self._queues[priority]
+        batch = [queue.popleft()]
+        tokens = batch[0].tokens
+        while queue and len(batch) < self.max_batch_items and tokens + queue[0].tokens <= self.max_batch_tokens:
+            job = queue.popleft()
+            batch.append(job)
+            tokens += job.tokens
+        self._queued_tokens[priority] -= tokens
+        return batch
+
+    def _next_batch(self) -> list:
+        """Wait until a batch may be sent and take it (called with the condition held)"""
+        while True:
+            timeout = None
+            now = time.monotonic()
+            for priority in (INTERACTIVE, BULK):
+                if not self._queues[priority]:
+                    continue
+                if self._inflight < self._slots(priority):
+                    if self._ready(priority, now):
+                        return self._take_batch(priority)
+                    wait = self._queues[priority][0].deadline - now
+                    timeout = wait if timeout is None else min(timeout, wait)
+                    # A lower priority batch that is ready may go while this one fills up
+                    continue
+                # No free slot for this priority, so none for lower ones either
+                break
+            self._cond.wait(timeout)
+
+    def _dispatch(self):
+        while True:
+            with self._cond:
+                batch = self._next_batch()
+                self._inflight += 1
+            self._executor.submit(self._run, batch)
+
+    def _run(self, batch: list):
+        try:
+            vectors = self.call(self._observed, [job.text for job in batch])
+        except Exception as e:
+            self.stats['failed'] += 1
+            for job in batch:
+                job.future.set_exception(e)
+        else:
+            for job, vector in zip(batch, vectors):
+                job.future.set_result(vector)
+        finally:
+            with self._cond:
+                self._inflight -= 1
+                self._cond.notify_all()
+
+    def _observed(self, texts: list) -> list:
+        """One backend request, feeding its outcome into the concurrency limit"""
+        try:
+            vectors = self.embed_batch(texts)
+        except Exception as e:
+            if is_rate_limited(e):
+                self._on_rate_limit()
+            raise
+        with self._cond:
+            self.stats['requests'] += 1
+            self.stats['texts'] += len(texts)
+            self.limit = min(self.max_concurrency, self.limit + 1 / self.limit)
+            self._cond.notify_all()
+        return vectors
+
+    def _on_rate_limit(self):
+        with self._cond:
+            self.stats['rate_limited'] += 1
+            now = time.monotonic()
+            # Responses to requests sent before the last decrease say nothing new
+            if now - self._last_decrease >= 1.0:
+                self.limit = max(self.min_concurrency, self.limit / 2)
+                self._last_decrease = now
+
+
+class ScheduledEmbeddings(Embeddings):
+    """Embeddings whose requests go through an EmbeddingScheduler: queries interactive, documents bulk"""
+
+    def __init__(self, embeddings: Embeddings, scheduler: EmbeddingScheduler = None, call: Callable = None):
+        self.embeddings = embeddings
+        self.scheduler = scheduler or EmbeddingScheduler(embeddings.embed_documents, call=call)
+        self.model = getattr(embeddings, 'model', type(embeddings).__name__)
+
+    def embed_documents(self, texts: list) -> list:
+        return self.scheduler.embed(texts, BULK)
+
+    def embed_query(self, text: str) -> list:
+        return self.scheduler.embed([text], INTERACTIVE)[0]
+
+    def __getattr__(self, item):
+        # Expose attributes of the wrapped embeddings (e.g. dims and counter on the benchmark fake)
+        if item.startswith('_') or item in ('embeddings', 'scheduler', 'model'):
+            raise AttributeError(item)
+        return getattr(self.embeddings, item)
@@ -1,17 +1,10 @@
 import logging
-import traceback
 from functools import wraps
 from typing import Callable, Any
 import streamlit as st
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('app.log'),
-        logging.StreamHandler()
-    ]
+# Re-exported for existing imports; configure_logging() is called by the entry points
+from utils.logging_setup import (
+    DeferredQueueHandler, JSONFormatter, RateLimitFilter, SizedTimedRotatingFileHandler, configure_logging
 )
 
 logger = logging.getLogger(__name__)
@@ -25,17 +18,20 @@ class ErrorHandler:
             try:
                 return func(*args, **kwargs)
             except Exception as e:
-                error_msg = f"API Error in {func.__name__}: {str(e)}"
-                logger.error(error_msg)
-                logger.error(traceback.format_exc())
-                
+                # Traceback is rendered by the listener thread, not here
+                logger.error(
+                    "API Error in %s: %s", func.__name__, e,
+                    exc_info=True,
+                    extra={'function': func.__name__, 'error_type': type(e).__name__}
+                )
+
                 # Show user-friendly error in Streamlit
                 if hasattr(st, 'session_state'):
                     st.error(f"⚠️ Service temporarily unavailable. Please try again.")
-                
+
                 return None
         return wrapper
-    
+
     @staticmethod
     def handle_file_error(func: Callable) -> Callable:
         """Decorator for handling file operation errors"""
@@ -44,32 +40,27 @@ class ErrorHandler:
             try:
                 return func(*args, **kwargs)
             except FileNotFoundError as e:
-                error_msg = f"File not found in {func.__name__}: {str(e)}"
-                logger.error(error_msg)
+                logger.error("File not found in %s: %s", func.__name__, e,
+                             extra={'function': func.__name__, 'error_type': type(e).__name__})
                 st.error("📁 File not found. Please check the file path.")
                 return None
             except PermissionError as e:
-                error_msg = f"Permission error in {func.__name__}: {str(e)}"
-                logger.error(error_msg)
+                logger.error("Permission error in %s: %s", func.__name__, e,
+                             extra={'function': func.__name__, 'error_type': type(e).__name__})
                 st.error("🔒 Permission denied. Please check file permissions.")
                 return None
             except Exception as e:
-                error_msg = f"File operation error in {func.__name__}: {str(e)}"
-                logger.error(error_msg)
-                logger.error(traceback.format_exc())
+                logger.error("File operation error in %s: %s", func.__name__, e,
+                             exc_info=True,
+                             extra={'function': func.__name__, 'error_type': type(e).__name__})
                 st.error("📄 File processing error. Please try again.")
                 return None
         return wrapper
-    
+
     @staticmethod
     def log_user_action(action: str, details: dict = None):
         """Log user actions for analytics"""
-        log_data = {
-            'action': action,
-            'timestamp': datetime.now().isoformat(),
-            'details': details or {}
-        }
-        logger.info(f"User Action: {log_data}")
+        logger.info("User Action: %s", action, extra={'action': action, 'details': details or {}})
 
 # Global error handler instance
-error_handler = ErrorHandler()
\ No newline at end of file
+error_handler = ErrorHandler()
@@ -0,0 +1,77 @@
+# Cross-process advisory file locks
+import os
+import threading
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+class FileLock:
+    """
+    Exclusive lock shared by every process that opens the same lock file.
+
+    Used to serialize read-modify-write cycles on files that several worker
+    processes share, such as the vector store. Re-entrant within a thread.
+
+    Usage:
+        with FileLock(Settings.VECTOR_DB_PATH / ".lock"):
+            ...
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._local = threading.local()
+        self._thread_lock = threading.RLock()
+
+    def acquire(self):
+        self._thread_lock.acquire()
+        depth = getattr(self._local, 'depth', 0)
+        if depth == 0:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            handle = open(self.path, 'a+b')
+            try:
+                if fcntl:
+                    fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+                else:
+                    handle.seek(0)
+                    msvcrt.locking(handle.fileno(), msvcrt.LK_LOCK, 1)
+            except Exception:
+                handle.close()
+                self._thread_lock.release()
+                raise
+            self._local.handle = handle
+        self._local.depth = depth + 1
+
+    def release(self):
+        self._local.depth -= 1
+        if self._local.depth == 0:
+            handle = self._local.handle
+            try:
+                if fcntl:
+                    fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+                else:
+                    handle.seek(0)
+                    msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+            finally:
+                handle.close()
+                self._local.handle = None
+        self._thread_lock.release()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+
+
+def path_mtime(path) -> float:
+    """Modification time of ``path``, or 0 if it does not exist"""
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return 0.0
@@ -0,0 +1,99 @@
+# Lazy service construction and background warm-up
+import importlib
+import logging
+import threading
+import time
+from typing import Callable, Union
+
+logger = logging.getLogger(__name__)
+
+
+class LazyService:
+    """
+    Proxy that builds the wrapped service on first attribute access.
+
+    The target is either a factory callable or an import path such as
+    ``"services.rag_service:RAGService"``; with an import path the service
+    module itself is not imported until the service is first used.
+    """
+
+    def __init__(self, target: Union[str, Callable], name: str = None):
+        self._target = target
+        self._name = name or (target if isinstance(target, str) else getattr(target, '__name__', repr(target)))
+        self._instance = None
+        self._lock = threading.Lock()
+        self.load_time = None
+
+    @property
+    def is_loaded(self) -> bool:
+        """Whether the service has been constructed"""
+        return self._instance is not None
+
+    def get(self):
+        """Construct the service if needed and return it"""
+        if self._instance is None:
+            with self._lock:
+                if self._instance is None:
+                    start_time = time.perf_counter()
+                    factory = self._resolve()
+                    self._instance = factory()
+                    self.load_time = time.perf_counter() - start_time
+                    logger.info("Loaded %s in %.2fs", self._name, self.load_time)
+        return self._instance
+
+    def _resolve(self) -> Callable:
+        if not isinstance(self._target, str):
+            return self._target
+        module_name, _, attr = self._target.partition(':')
+        return getattr(importlib.import_module(module_name), attr)
+
+    def __getattr__(self, item):
+        # Only reached for attributes not defined on the proxy itself
+        if item.startswith('_'):
+            raise AttributeError(item)
+        return getattr(self.get(), item)
+
+    def __repr__(self):
+        state = 'loaded' if self.is_loaded else 'not loaded'
+        return f"<LazyService {self._name} ({state})>"
+
+
+_warm_up_started = set()
+_warm_up_lock = threading.Lock()
+
+
+def warm_up(services: dict, names: list = None) -> threading.Thread:
+    """
+    Construct lazy services on a background thread.
+
+    Each service is warmed at most once per process, so this is safe to call
+    on every Streamlit rerun.
+
+    Args:
+        services: Mapping of name to LazyService
+        names: Services to warm (defaults to all)
+
+    Returns:
+        The warm-up thread, or None if there was nothing left to warm
+    """
+    with _warm_up_lock:
+        pending = [
+            name for name in (names if names is not None else services)
+            if name in services and isinstance(services[name], LazyService)
+            and not services[name].is_loaded and id(services[name]) not in _warm_up_started
+        ]
+        _warm_up_started.update(id(services[name]) for name in pending)
+
+    if not pending:
+        return None
+
+    def run():
+        for name in pending:
+            try:
+                services[name].get()
+            except Exception as e:
+                logger.warning("Warm-up of %s failed: %s", name, e)
+
+    thread = threading.Thread(target=run, name="service-warm-up", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,184 @@
+# Logging pipeline: JSON records written by a background thread, rotated and deduplicated
+"""
+Nothing is configured on import; entry points call configure_logging().
+Until then log records go to Python's last-resort stderr handler.
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import threading
+import time
+import traceback
+from datetime import datetime
+from pathlib import Path
+
+from config.settings import Settings
+
+# Attributes every LogRecord has; anything else was passed via ``extra=``
+_RESERVED_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+
+class JSONFormatter(logging.Formatter):
+    """Render log records as single-line JSON documents"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            'timestamp': datetime.fromtimestamp(record.created).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'thread': record.threadName,
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS and not key.startswith('_'):
+                payload[key] = value
+        if record.exc_info:
+            payload['exception'] = ''.join(traceback.format_exception(*record.exc_info))
+        return json.dumps(payload, default=str, ensure_ascii=False)
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    Queue handler that leaves all formatting to the listener thread.
+
+    The stock ``QueueHandler.prepare`` formats the message and traceback on
+    the calling thread; here the record is only copied so the request thread
+    pays for nothing more than a queue put.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return logging.makeLogRecord(record.__dict__)
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            # Never block a request on logging; drop the record instead
+            pass
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Suppress repeats of the same warning/error within a time window.
+
+    Records are keyed on logger, level, rendered message and exception type.
+    The first occurrence passes through; repeats inside the window are
+    dropped and counted, and the next record that passes after the window
+    expires carries the number of suppressed duplicates.
+    """
+
+    def __init__(self, window: float = 60, min_level: int = logging.WARNING):
+        super().__init__()
+        self.window = window
+        self.min_level = min_level
+        self._seen = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno < self.min_level:
+            return True
+
+        exc_type = record.exc_info[0].__name__ if record.exc_info and record.exc_info[0] else None
+        key = (record.name, record.levelno, record.getMessage(), exc_type)
+        now = time.monotonic()
+
+        with self._lock:
+            first_seen, suppressed = self._seen.get(key, (None, 0))
+            if first_seen is not None and now - first_seen < self.window:
+                self._seen[key] = (first_seen, suppressed + 1)
+                return False
+
+            self._seen[key] = (now, 0)
+            # Drop expired keys so the table cannot grow without limit
+            if len(self._seen) > 1024:
+                self._seen = {k: v for k, v in self._seen.items() if now - v[0] < self.window}
+
+        if suppressed:
+            record.suppressed_duplicates = suppressed
+        return True
+
+
+class SizedTimedRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """Rotating file handler that rolls over on size or elapsed time, whichever comes first"""
+
+    def __init__(self, filename, max_bytes: int, backup_count: int, interval: float, encoding: str = 'utf-8'):
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backup_count, encoding=encoding, delay=True)
+        self.interval = interval
+        self.rollover_at = time.time() + interval
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        if self.interval and time.time() >= self.rollover_at:
+            return True
+        return bool(super().shouldRollover(record))
+
+    def doRollover(self):
+        super().doRollover()
+        self.rollover_at = time.time() + self.interval
+
+
+_listener = None
+
+
+def configure_logging(log_file=None, level: str = None, process_name: str = None) -> logging.handlers.QueueListener:
+    """
+    Route root logging through a background queue listener.
+
+    Request threads only enqueue records; the listener thread formats them as
+    JSON into a size/time rotated file and as plain text to the console.
+    Calling this more than once returns the running listener. Each entry
+    point (app.py, api_server.py, batch_cli.py) calls it once at startup.
+
+    Args:
+        log_file: Log file path (defaults to Settings.LOG_FILE)
+        level: Root log level name (defaults to Settings.LOG_LEVEL)
+        process_name: Added to the file name (app.<process_name>.log) so that
+                      processes running side by side, such as API workers,
+                      each rotate their own file
+
+    Returns:
+        The running queue listener
+    """
+    global _listener
+    if _listener is not None:
+        return _listener
+
+    log_file = Path(log_file or Settings.LOG_FILE)
+    if process_name:
+        log_file = log_file.with_name(f"{log_file.stem}.{process_name}{log_file.suffix}")
+    handlers = [logging.StreamHandler()]
+    handlers[0].setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+    try:
+        log_file.parent.mkdir(parents=True, exist_ok=True)
+        file_handler = SizedTimedRotatingFileHandler(
+            log_file,
+            max_bytes=Settings.LOG_MAX_BYTES,
+            backup_count=Settings.LOG_BACKUP_COUNT,
+            interval=Settings.LOG_ROTATE_INTERVAL
+        )
+        file_handler.setFormatter(JSONFormatter())
+        handlers.append(file_handler)
+    except OSError as e:
+        print(f"Log file setup error: {e}")
+
+    log_queue = queue.Queue(maxsize=10000)
+    queue_handler = DeferredQueueHandler(log_queue)
+    queue_handler.addFilter(RateLimitFilter(window=Settings.LOG_DEDUP_WINDOW))
+
+    root = logging.getLogger()
+    root.setLevel(level or Settings.LOG_LEVEL)
+    root.addHandler(queue_handler)
+
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+    return _listener
+
+
+def stop_logging():
+    """Write out queued records and stop the listener thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,270 @@
+# Shared remote-call layer for backend services
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Callable, Any
+import requests
+from requests.adapters import HTTPAdapter
+from config.settings import Settings
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+# Exception class names raised by provider SDKs (openai, httpx, gTTS) for
+# transient failures; matched by name so none of those SDKs need importing here
+RETRYABLE_ERROR_NAMES = {
+    'Timeout', 'TimeoutError', 'ReadTimeout', 'ConnectTimeout', 'APITimeoutError',
+    'ConnectionError', 'ConnectError', 'APIConnectionError', 'RemoteDisconnected',
+    'RateLimitError', 'ServiceUnavailableError', 'InternalServerError', 'APIError',
+    'TryAgain', 'gTTSError'
+}
+
+
+class RemoteCallError(Exception):
+    """Raised when a remote call fails after all retries"""
+
+
+class CircuitOpenError(RemoteCallError):
+    """Raised without calling the backend while its circuit breaker is open"""
+
+
+def is_retryable(error: Exception) -> bool:
+    """Decide whether a failed remote call is worth retrying"""
+    status = getattr(error, 'status_code', None) or getattr(error, 'http_status', None)
+    response = getattr(error, 'response', None)
+    if status is None and response is not None:
+        status = getattr(response, 'status_code', None)
+    if status is not None:
+        return status in RETRYABLE_STATUS_CODES
+    return any(cls.__name__ in RETRYABLE_ERROR_NAMES for cls in type(error).__mro__)
+
+
+def is_rate_limited(error: Exception) -> bool:
+    """Whether a failed remote call was rejected for exceeding the backend's rate limit"""
+    status = getattr(error, 'status_code', None) or getattr(error, 'http_status', None)
+    response = getattr(error, 'response', None)
+    if status is None and response is not None:
+        status = getattr(response, 'status_code', None)
+    if status is not None:
+        return status == 429
+    return any(cls.__name__ == 'RateLimitError' for cls in type(error).__mro__)
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter"""
+
+    def __init__(self, max_attempts: int = 3, base_delay: float = 0.5, max_delay: float = 10.0):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delay(self, attempt: int) -> float:
+        """Sleep time before retry number ``attempt`` (1-based)"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+
+class CircuitBreaker:
+    """
+    Fail fast while a backend is unhealthy.
+
+    After ``failure_threshold`` consecutive failures the breaker opens and
+    rejects calls for ``reset_timeout`` seconds. It then lets a single trial
+    call through (half-open); success closes it again, failure re-opens it.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Whether a call may proceed right now"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def record_rejection(self):
+        """The backend answered but refused the request (e.g. 400, 429): healthy, so a half-open trial closes"""
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self.state = self.CLOSED
+                self.failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+
+class RemoteClient:
+    """
+    Resilient caller for one backend.
+
+    Every call goes through a circuit breaker, a concurrency limit and a
+    jittered retry loop. HTTP calls share a pooled keep-alive session.
+    """
+
+    def __init__(self, name: str, max_concurrency: int = 8, timeout: float = 30.0,
+                 retry: RetryPolicy = None, breaker: CircuitBreaker = None,
+                 hedge_delay: float = None, pool_size: int = None):
+        self.name = name
+        self.timeout = timeout
+        self.retry = retry or RetryPolicy()
+        self.breaker = breaker or CircuitBreaker()
+        self.hedge_delay = hedge_delay
+        self.pool_size = pool_size or max_concurrency
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._session = None
+        self._session_lock = threading.Lock()
+        self._executor = None
+
+    @property
+    def session(self) -> requests.Session:
+        """Keep-alive HTTP session shared by every call to this backend"""
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    session = requests.Session()
+                    # Retries are handled by call(), not by urllib3
+                    adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size, max_retries=0)
+                    session.mount('http://', adapter)
+                    session.mount('https://', adapter)
+                    self._session = session
+        return self._session
+
+    def call(self, func: Callable, *args, **kwargs) -> Any:
+        """
+        Call ``func`` with circuit breaking, concurrency limiting and retries
+
+        Raises:
+            CircuitOpenError: The backend is failing and the call was not attempted
+            RemoteCallError: The call failed after all retries
+        """
+        last_error = None
+        for attempt in range(1, self.retry.max_attempts + 1):
+            if not self._slots.acquire(timeout=self.timeout):
+                raise RemoteCallError(f"{self.name} concurrency limit reached")
+            try:
+                # Asked only once a slot is held: allow() may start a half-open trial,
+                # and every trial must end in one of the record_*() calls below
+                if not self.breaker.allow():
+                    raise CircuitOpenError(f"{self.name} circuit open") from last_error
+                try:
+                    result = func(*args, **kwargs)
+                except BaseException as e:
+                    last_error = e
+                    if not isinstance(e, Exception):
+                        # KeyboardInterrupt, SystemExit: not retried, but the trial still ends
+                        self.breaker.record_failure()
+                        raise
+                    if not is_retryable(e):
+                        # Client-side errors say nothing about backend health, but must
+                        # still end a half-open trial or the breaker never closes again
+                        self.breaker.record_rejection()
+                        raise
+                    if is_rate_limited(e):
+                        # The backend is up and asking for less traffic: backing off is enough,
+                        # opening the circuit would also fail every other caller of this backend
+                        self.breaker.record_rejection()
+                    else:
+                        self.breaker.record_failure()
+                    logger.warning("%s call failed (attempt %d/%d): %s", self.name, attempt, self.retry.max_attempts, e)
+                else:
+                    self.breaker.record_success()
+                    return result
+            finally:
+                self._slots.release()
+
+            if attempt < self.retry.max_attempts:
+                time.sleep(self.retry.delay(attempt))
+
+        raise RemoteCallError(f"{self.name} call failed after {self.retry.max_attempts} attempts: {last_error}") from last_error
+
+    def hedged_call(self, func: Callable, *args, hedge_delay: float = None, **kwargs) -> Any:
+        """
+        Call ``func`` and, if it has not answered within ``hedge_delay``
+        seconds, race a second identical call against it.
+
+        Only use for idempotent calls. Falls back to call() when no hedge
+        delay is configured.
+        """
+        hedge_delay = hedge_delay if hedge_delay is not None else self.hedge_delay
+        if hedge_delay is None:
+            return self.call(func, *args, **kwargs)
+
+        if self._executor is None:
+            with self._session_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix=f"hedge-{self.name}")
+
+        pending = {self._executor.submit(self.call, func, *args, **kwargs)}
+        done, _ = wait(pending, timeout=hedge_delay)
+        if not done:
+            pending.add(self._executor.submit(self.call, func, *args, **kwargs))
+
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Send an HTTP request over the pooled session; 5xx/429 responses are retried"""
+        kwargs.setdefault('timeout', self.timeout)
+
+        def send():
+            response = self.session.request(method, url, **kwargs)
+            response.raise_for_status()
+            return response
+
+        return self.call(send)
+
+    def stats(self) -> dict:
+        """Current breaker state for monitoring"""
+        return {'name': self.name, 'state': self.breaker.state, 'failures': self.breaker.failures}
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(name: str) -> RemoteClient:
+    """Get the shared client for a backend configured in Settings.REMOTE_BACKENDS"""
+    with _clients_lock:
+        if name not in _clients:
+            config = dict(Settings.REMOTE_BACKENDS.get(name, {}))
+            retry = RetryPolicy(
+                max_attempts=config.pop('max_attempts', 3),
+                base_delay=config.pop('base_delay', 0.5),
+                max_delay=config.pop('max_delay', 10.0)
+            )
+            breaker = CircuitBreaker(
+                failure_threshold=config.pop('failure_threshold', 5),
+                reset_timeout=config.pop('reset_timeout', 30.0)
+            )
+            _clients[name] = RemoteClient(name, retry=retry, breaker=breaker, **config)
+        return _clients[name]
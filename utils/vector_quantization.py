@@ -0,0 +1,116 @@
+# Compressed FAISS indexes with full-precision re-ranking
+"""
+A quantized index keeps 1 byte per dimension (scalar quantization, "sq8")
+or a few bytes per vector (product quantization, "pq") in memory instead of
+4 bytes per dimension. Its distances are approximate, so searches fetch
+extra candidates and re-rank them exactly against a float32 copy of the
+vectors kept on disk (memory-mapped, read only for those candidates).
+"""
+import os
+from pathlib import Path
+
+import numpy as np
+
+QUANTIZATION_METHODS = ('none', 'sq8', 'pq')
+
+
+def pq_subvectors(dims: int, subvectors: int = None) -> int:
+    """Number of PQ sub-quantizers: ``subvectors`` if it divides ``dims``, else the largest divisor of dims <= dims // 16"""
+    target = subvectors or max(1, dims // 16)
+    if dims % target == 0:
+        return target
+    return max(m for m in range(1, min(target, dims) + 1) if dims % m == 0)
+
+
+def min_training_vectors(method: str, pq_bits: int = 8) -> int:
+    """Fewest vectors a quantizer can be trained on"""
+    return 2 ** pq_bits if method == 'pq' else 1
+
+
+def build_index(vectors: np.ndarray, method: str, pq_m: int = None, pq_bits: int = 8):
+    """
+    Train and fill a FAISS index of the given method
+
+    Args:
+        vectors: (n, dims) float32 array
+        method: 'none' (exact, float32), 'sq8' or 'pq'
+        pq_m: PQ sub-quantizers (bytes per vector with 8-bit codes); see pq_subvectors()
+        pq_bits: Bits per PQ code
+    """
+    import faiss
+
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    dims = vectors.shape[1]
+    if method == 'none':
+        index = faiss.IndexFlatL2(dims)
+    elif method == 'sq8':
+        index = faiss.IndexScalarQuantizer(dims, faiss.ScalarQuantizer.QT_8bit, faiss.METRIC_L2)
+    elif method == 'pq':
+        index = faiss.IndexPQ(dims, pq_subvectors(dims, pq_m), pq_bits)
+    else:
+        raise ValueError(f"Unknown quantization method: {method!r} (expected one of {QUANTIZATION_METHODS})")
+    if not index.is_trained:
+        index.train(vectors)
+    index.add(vectors)
+    return index
+
+
+def index_method(index) -> str:
+    """'sq8', 'pq' or 'none' for an index built by build_index()"""
+    import faiss
+
+    index = faiss.downcast_index(index)
+    if isinstance(index, faiss.IndexScalarQuantizer):
+        return 'sq8'
+    if isinstance(index, faiss.IndexPQ):
+        return 'pq'
+    return 'none'
+
+
+def bytes_per_vector(index) -> int:
+    return index.sa_code_size()
+
+
+class FullPrecisionVectors:
+    """
+    float32 copy of an index's vectors in a flat file, row i = FAISS id i
+
+    Rows are written at their id's offset, so a write whose index was never
+    saved is simply overwritten by the next one. The file only grows: rows
+    past a write may belong to ids another process has added.
+    """
+
+    def __init__(self, path: Path, dims: int):
+        self.path = Path(path)
+        self.dims = dims
+        self._row_bytes = dims * 4
+        self._map = None
+
+    def __len__(self):
+        return self.path.stat().st_size // self._row_bytes if self.path.exists() else 0
+
+    def write(self, start: int, vectors: np.ndarray):
+        """Store ``vectors`` as rows ``start``, ``start + 1``, ..."""
+        data = np.ascontiguousarray(vectors, dtype='<f4')
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Opened without truncating, even if another process creates the file first
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT | getattr(os, 'O_BINARY', 0), 0o644)
+        with os.fdopen(fd, 'r+b') as f:
+            f.seek(start * self._row_bytes)
+            f.write(data.tobytes())
+        self._map = None
+
+    def rows(self, ids: np.ndarray) -> np.ndarray:
+        """Vectors for the given ids (read through a memory map)"""
+        if self._map is None or len(self._map) < len(self):
+            self._map = np.memmap(self.path, dtype='<f4', mode='r').reshape(-1, self.dims)
+        return np.asarray(self._map[ids])
+
+    def rerank(self, query: np.ndarray, ids: np.ndarray, k: int) -> tuple:
+        """Exact squared L2 distances for candidate ``ids``; returns the ``k`` closest (ids, distances)"""
+        ids = ids[ids >= 0]
+        if not len(ids):
+            return ids, np.empty(0, dtype=np.float32)
+        distances = ((self.rows(ids) - query) ** 2).sum(axis=1)
+        order = np.argsort(distances, kind='stable')[:k]
+        return ids[order], distances[order]